@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Pages and tests import `utils.*` relative to the app directory, as `streamlit run` does
+sys.path.insert(0, str(Path(__file__).resolve().parent))
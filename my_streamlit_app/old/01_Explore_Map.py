@@ -23,12 +23,33 @@ st.caption("Klikk på et prisområde i kartet for å velge område. Se statistik
 # -----------------------------
 # Cached GeoJSON
 # -----------------------------
+def _round_coords(coords, ndigits: int = 4):
+    """Round nested GeoJSON coordinates (4 decimals is ~10 m) and drop points that collapse onto the previous one."""
+    if isinstance(coords[0], (int, float)):
+        return [round(c, ndigits) for c in coords]
+    rounded = [_round_coords(c, ndigits) for c in coords]
+    if isinstance(rounded[0][0], float):
+        rounded = [p for i, p in enumerate(rounded) if i == 0 or p != rounded[i - 1]]
+    return rounded
+
+
 @st.cache_data(show_spinner=False)
 def load_geojson() -> dict:
     base_dir = os.path.dirname(os.path.dirname(__file__))
     geojson_path = os.path.join(base_dir, "assets", "file.geojson")
     with open(geojson_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+        geojson = json.load(f)
+
+    # The whole GeoJSON is embedded in the figure sent to the browser, so keep only
+    # the join key and map-resolution coordinates
+    for feature in geojson["features"]:
+        feature["properties"] = {"ElSpotOmr": feature["properties"]["ElSpotOmr"]}
+        feature["geometry"]["coordinates"] = _round_coords(feature["geometry"]["coordinates"])
+    return geojson
+
+
+# GeoJSON uses "NO 1" where the data uses "NO1"
+AREA_DISPLAY = {area: area.replace("NO", "NO ") for area in city_data_df["PriceArea"]}
 
 
 # -----------------------------
@@ -41,33 +62,90 @@ def load_dataset(data_type: str) -> pd.DataFrame:
     return load_consumption_data()
 
 
+@st.cache_data(show_spinner=False)
+def daily_rollup(data_type: str) -> pd.DataFrame:
+    """Daily sum and row count per area (and group), indexed by day."""
+    df = load_dataset(data_type)
+    group_col = "productiongroup" if data_type == "Production" else "consumptiongroup"
+    keys = [pd.to_datetime(df["starttime"]).dt.floor("D").rename("day"), df["area"]]
+    if group_col in df.columns:
+        keys.append(df[group_col])
+    return (
+        df.groupby(keys, observed=True)["quantitykwh"]
+        .agg(["sum", "count"])
+        .reset_index(level=list(range(1, len(keys))))
+        .sort_index()
+    )
+
+
 @st.cache_data(show_spinner=False)
 def compute_area_means(
-    df: pd.DataFrame,
     data_type: str,
     group: str,
     start_ts: pd.Timestamp,
     end_ts: pd.Timestamp,
 ) -> pd.DataFrame:
-    df = df.copy()
-    df["starttime"] = pd.to_datetime(df["starttime"])
-
-    mask = (df["starttime"] >= start_ts) & (df["starttime"] <= end_ts)
-    df = df.loc[mask]
+    # Slice the small daily rollup instead of masking the full hourly table
+    rollup = daily_rollup(data_type)
+    lo = rollup.index.searchsorted(start_ts.floor("D"), side="left")
+    hi = rollup.index.searchsorted(end_ts, side="right")
+    df = rollup.iloc[lo:hi]
 
     group_col = "productiongroup" if data_type == "Production" else "consumptiongroup"
     if group != "Total" and group_col in df.columns:
         df = df[df[group_col] == group]
 
-    out = (
-        df.groupby("area", as_index=False)["quantitykwh"]
-        .mean()
-        .rename(columns={"quantitykwh": "mean_kwh"})
-    )
+    totals = df.groupby("area", observed=True)[["sum", "count"]].sum()
+    out = (totals["sum"] / totals["count"]).rename("mean_kwh").reset_index()
     return out
 
 
-def safe_groups(df: pd.DataFrame, data_type: str) -> list[str]:
+@st.cache_data(show_spinner=False)
+def area_rows_by_time(data_type: str, area: str) -> pd.DataFrame:
+    """Rows for one area, indexed by starttime (already sorted by the loader) so time windows are a binary search."""
+    df = load_dataset(data_type)
+    return df[df["area"] == area].set_index("starttime")
+
+
+def time_window(df: pd.DataFrame, start_ts: pd.Timestamp, end_ts: pd.Timestamp) -> pd.DataFrame:
+    lo = df.index.searchsorted(start_ts, side="left")
+    hi = df.index.searchsorted(end_ts, side="right")
+    return df.iloc[lo:hi]
+
+
+@st.cache_resource(show_spinner=False)
+def build_map_figure(area_means: tuple) -> go.Figure:
+    """Choropleth for ((area, mean_kwh), ...); identical views reuse the same figure."""
+    map_df = pd.DataFrame(list(area_means), columns=["area", "mean_kwh"])
+    map_df["area_display"] = map_df["area"].map(AREA_DISPLAY)
+
+    fig = px.choropleth_mapbox(
+        map_df,
+        geojson=load_geojson(),
+        locations="area_display",
+        featureidkey="properties.ElSpotOmr",
+        color="mean_kwh",
+        hover_name="area",
+        hover_data={"area_display": False, "mean_kwh": ":.0f"},
+        mapbox_style="carto-positron",
+        center={"lat": 65, "lon": 15},
+        zoom=3.5,
+        opacity=0.65,
+        labels={"mean_kwh": "Mean kWh"},
+    )
+
+    # Make clicks/selects possible
+    fig.update_layout(
+        height=520,
+        margin=dict(l=0, r=0, t=0, b=0),
+        clickmode="event+select",
+    )
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def safe_groups(data_type: str) -> list[str]:
+    df = load_dataset(data_type)
     if data_type == "Production":
         col = "productiongroup"
     else:
@@ -90,15 +168,13 @@ if "chosen_area" not in st.session_state:
 # -----------------------------
 # Controls
 # -----------------------------
-geojson_data = load_geojson()
 areas = city_data_df["PriceArea"].drop_duplicates().tolist()
 
 c1, c2, c3 = st.columns([1, 1, 1])
 with c1:
     data_type = st.selectbox("Data", ["Production", "Consumption"], index=0)
 with c2:
-    df_all = load_dataset(data_type)
-    group = st.selectbox("Group", safe_groups(df_all, data_type), index=0)
+    group = st.selectbox("Group", safe_groups(data_type), index=0)
 with c3:
     days = st.slider("Days back", 7, 180, 30, 7)
 
@@ -114,44 +190,15 @@ col_map, col_stats = st.columns([2, 1], gap="large")
 with col_map:
     # Build map values (mean per area)
     area_means_df = compute_area_means(
-        df=df_all,
         data_type=data_type,
         group=group,
         start_ts=start_ts,
         end_ts=end_ts,
     )
 
-    # Ensure all areas present
-    map_df = (
-        pd.DataFrame({"area": areas})
-        .merge(area_means_df, on="area", how="left")
-        .fillna({"mean_kwh": 0.0})
-    )
-
-    # GeoJSON uses "NO 1"
-    map_df["area_display"] = map_df["area"].str.replace("NO", "NO ", regex=False)
-
-    fig = px.choropleth_mapbox(
-        map_df,
-        geojson=geojson_data,
-        locations="area_display",
-        featureidkey="properties.ElSpotOmr",
-        color="mean_kwh",
-        hover_name="area",
-        hover_data={"area_display": False, "mean_kwh": ":.0f"},
-        mapbox_style="carto-positron",
-        center={"lat": 65, "lon": 15},
-        zoom=3.5,
-        opacity=0.65,
-        labels={"mean_kwh": "Mean kWh"},
-    )
-
-    # Make clicks/selects possible
-    fig.update_layout(
-        height=520,
-        margin=dict(l=0, r=0, t=0, b=0),
-        clickmode="event+select",
-    )
+    # Ensure all areas present; rounding keeps the figure cache key stable
+    area_means = area_means_df.set_index("area")["mean_kwh"]
+    fig = build_map_figure(tuple((a, round(float(area_means.get(a, 0.0)), 2)) for a in areas))
 
     st.markdown(f"**Selected area:** `{st.session_state['chosen_area']}`")
 
@@ -174,27 +221,32 @@ with col_map:
                 st.session_state["chosen_area"] = new_area
                 st.rerun()
 
-    # Optional manual fallback
+    # Optional manual fallback: one widget, and the callback updates the area before the rerun
+    value_display = {a: f"{a} · {area_means.get(a, 0.0):,.0f} kWh" for a in areas}
+
+    def _sync_manual_area():
+        chosen = st.session_state["manual_area_select"]
+        if chosen is not None:
+            st.session_state["chosen_area"] = chosen
+
     with st.expander("Velg område manuelt"):
-        chosen = st.selectbox(
+        st.segmented_control(
             "Price area",
             areas,
-            index=areas.index(st.session_state["chosen_area"]),
+            format_func=value_display.get,
+            default=st.session_state["chosen_area"],
             key="manual_area_select",
+            on_change=_sync_manual_area,
         )
-        if chosen != st.session_state["chosen_area"]:
-            st.session_state["chosen_area"] = chosen
-            st.rerun()
 
 
 with col_stats:
     chosen_area = st.session_state["chosen_area"]
     st.subheader("📌 Statistics")
 
-    # Filter df for chosen area + time window (+ group if not Total)
-    df = df_all.copy()
-    df["starttime"] = pd.to_datetime(df["starttime"])
-    df = df[(df["area"] == chosen_area) & (df["starttime"] >= start_ts) & (df["starttime"] <= end_ts)]
+    # Slice the chosen area's time window (+ group if not Total)
+    df_window = time_window(area_rows_by_time(data_type, chosen_area), start_ts, end_ts)
+    df = df_window
 
     group_col = "productiongroup" if data_type == "Production" else "consumptiongroup"
     if group != "Total" and group_col in df.columns:
@@ -218,22 +270,14 @@ with col_stats:
 
     # Small time series (daily sum)
     st.markdown("#### Trend")
-    series = (
-        df.set_index("starttime")["quantitykwh"]
-        .resample("D")
-        .sum()
-        .sort_index()
-    )
+    series = df["quantitykwh"].resample("D").sum()
     fig_ts = go.Figure()
     fig_ts.add_trace(go.Scatter(x=series.index, y=series.values, mode="lines"))
     fig_ts.update_layout(height=260, margin=dict(l=0, r=0, t=10, b=0), xaxis_title="", yaxis_title="")
     st.plotly_chart(fig_ts, use_container_width=True)
 
     # Breakdown (if production and Total -> show groups)
-    if data_type == "Production" and group == "Total" and "productiongroup" in df_all.columns:
+    if data_type == "Production" and group == "Total" and "productiongroup" in df_window.columns:
         st.markdown("#### Breakdown (sum)")
-        df_area = df_all.copy()
-        df_area["starttime"] = pd.to_datetime(df_area["starttime"])
-        df_area = df_area[(df_area["area"] == chosen_area) & (df_area["starttime"] >= start_ts) & (df_area["starttime"] <= end_ts)]
-        grp = df_area.groupby("productiongroup")["quantitykwh"].sum().sort_values(ascending=False).head(8)
+        grp = df_window.groupby("productiongroup", observed=True)["quantitykwh"].sum().sort_values(ascending=False).head(8)
         st.dataframe(grp.reset_index().rename(columns={"quantitykwh": "sum_kwh"}), use_container_width=True, hide_index=True)
\ No newline at end of file
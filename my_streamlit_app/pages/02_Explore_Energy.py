@@ -3,7 +3,7 @@ import pandas as pd
 import plotly.express as px
 
 from utils.ui_helpers import choose_price_area
-from utils.load_energy_data import load_energy_data, load_consumption_data
+from utils.load_energy_data import load_energy_by_area, load_consumption_by_area, ENERGY_VIEW_TTL
 
 
 # -----------------------------
@@ -17,19 +17,58 @@ st.markdown("Explore **daily** production (left) and **daily** consumption (righ
 # -----------------------------
 # Load data (once)
 # -----------------------------
-prod_df = load_energy_data()
-cons_df = load_consumption_data()
+@st.cache_data(show_spinner=False, ttl=ENERGY_VIEW_TTL)
+def _area_by_period(kind: str, area: str) -> pd.DataFrame:
+    """Rows for one area, indexed by (year, month) and sorted so a period is one .loc lookup."""
+    by_area = load_energy_by_area() if kind == "production" else load_consumption_by_area()
+    return by_area[area].set_index(["year", "month"]).sort_index()
+
+
+@st.cache_data(show_spinner=False, ttl=ENERGY_VIEW_TTL)
+def _area_options(kind: str, area: str) -> dict:
+    """Months, years and groups present for one area, so widgets don't rescan the data on reruns."""
+    df = _area_by_period(kind, area)
+    group_col = "productiongroup" if kind == "production" else "consumptiongroup"
+    return {
+        "months": df.index.get_level_values("month").unique().tolist(),
+        "years": sorted(df.index.get_level_values("year").unique().tolist()),
+        "groups": sorted(df[group_col].dropna().unique().tolist()) if group_col in df.columns else [],
+    }
+
+
+@st.cache_data(show_spinner=False, ttl=ENERGY_VIEW_TTL)
+def _year_group_totals(kind: str, area: str) -> pd.DataFrame:
+    """Yearly kWh per group for one area, indexed by year and sorted largest first within a year."""
+    df = _area_by_period(kind, area)
+    group_col = "productiongroup" if kind == "production" else "consumptiongroup"
+    if group_col not in df.columns:
+        return pd.DataFrame(columns=[group_col, "quantitykwh"])
+    return (
+        df.groupby(["year", group_col], observed=True)["quantitykwh"]
+        .sum()
+        .reset_index(level=group_col)
+        .sort_values(["year", "quantitykwh"], ascending=[True, False])
+    )
+
+
+def _rows_for(df: pd.DataFrame, key) -> pd.DataFrame:
+    """Rows for a year or (year, month) key of the period index, or an empty frame."""
+    try:
+        return df.loc[key]
+    except KeyError:
+        return df.iloc[0:0]
+
 
 # Area selection
 chosen_area, _ = choose_price_area(show_selector=True)
 
 # Filter area once
-prod_area = prod_df[prod_df["area"] == chosen_area].copy()
-cons_area = cons_df[cons_df["area"] == chosen_area].copy()
-
-# Ensure datetime
-prod_area["starttime"] = pd.to_datetime(prod_area["starttime"])
-cons_area["starttime"] = pd.to_datetime(cons_area["starttime"])
+prod_area = _area_by_period("production", chosen_area)
+cons_area = _area_by_period("consumption", chosen_area)
+prod_options = _area_options("production", chosen_area)
+cons_options = _area_options("consumption", chosen_area)
+prod_totals = _year_group_totals("production", chosen_area)
+cons_totals = _year_group_totals("consumption", chosen_area)
 
 
 def _metrics_block(df: pd.DataFrame, label: str = "kWh"):
@@ -51,15 +90,10 @@ def _daily_sum_for_lineplot(
     chosen_month: str,
 ) -> pd.DataFrame:
     """Return a daily-summed DF with columns: date, quantitykwh (+ group col if exists)."""
-    out = df.copy()
-
-    # Apply filters
+    # Period lookup on the sorted index, then the group filter on the small slice
+    out = _rows_for(df, (chosen_year, chosen_month))
     if group_col and selected_groups:
         out = out[out[group_col].isin(selected_groups)]
-    if "year" in out.columns:
-        out = out[out["year"] == chosen_year]
-    if "month" in out.columns:
-        out = out[out["month"] == chosen_month]
 
     if out.empty:
         return out
@@ -68,7 +102,7 @@ def _daily_sum_for_lineplot(
     if group_col and group_col in out.columns:
         daily = (
             out.set_index("starttime")
-               .groupby(group_col)["quantitykwh"]
+               .groupby(group_col, observed=True)["quantitykwh"]
                .resample("D")
                .sum()
                .reset_index()
@@ -93,12 +127,10 @@ def _daily_sum_for_lineplot(
 months = []
 years = []
 
-if "month" in prod_area.columns and "year" in prod_area.columns and not prod_area.empty:
-    months = prod_area["month"].dropna().unique().tolist()
-    years = sorted(prod_area["year"].dropna().unique().tolist())
-elif "month" in cons_area.columns and "year" in cons_area.columns and not cons_area.empty:
-    months = cons_area["month"].dropna().unique().tolist()
-    years = sorted(cons_area["year"].dropna().unique().tolist())
+if prod_options["months"] and prod_options["years"]:
+    months, years = prod_options["months"], prod_options["years"]
+elif cons_options["months"] and cons_options["years"]:
+    months, years = cons_options["months"], cons_options["years"]
 
 # Safe defaults
 if not months:
@@ -120,17 +152,16 @@ st.divider()
 
 
 # Layout: Production (left) / Consumption (right)
-
-col_prod, col_cons = st.columns(2, gap="large")
+# Each side is a fragment, so picking groups only reruns that side
 
 # =========================================================
 # LEFT: PRODUCTION
 # =========================================================
-with col_prod:
+@st.fragment
+def production_panel(prod_area: pd.DataFrame, prod_totals: pd.DataFrame, prod_groups: list[str], chosen_area: str, chosen_year: int, chosen_month: str):
     st.header("🔌 Production")
 
     group_col = "productiongroup" if "productiongroup" in prod_area.columns else None
-    prod_groups = sorted(prod_area[group_col].dropna().unique().tolist()) if group_col else []
 
     st.subheader("Daily production over time")
     sel_prod_groups = st.pills(
@@ -159,7 +190,13 @@ with col_prod:
             title=f"{chosen_area} – {chosen_month} {chosen_year} (daily sum)",
             labels={"date": "Date", "quantitykwh": "kWh/day", "productiongroup": "Group"},
         )
-        fig_prod_line.update_layout(height=360, margin=dict(l=20, r=20, t=60, b=40), hovermode="x unified")
+        fig_prod_line.update_layout(
+            height=360,
+            margin=dict(l=20, r=20, t=60, b=40),
+            hovermode="x unified",
+            # keep zoom/pan while toggling groups, reset when the period changes
+            uirevision=f"{chosen_area}-{chosen_year}-{chosen_month}",
+        )
         st.plotly_chart(fig_prod_line, use_container_width=True)
     else:
         st.write("No production data for chosen combination.")
@@ -167,16 +204,9 @@ with col_prod:
     st.divider()
 
     st.subheader("Total production per group (year)")
-    prod_year_df = prod_area.copy()
-    if "year" in prod_year_df.columns:
-        prod_year_df = prod_year_df[prod_year_df["year"] == chosen_year]
-
-    if not prod_year_df.empty and "productiongroup" in prod_year_df.columns:
-        prod_group_sum = (
-            prod_year_df.groupby("productiongroup", as_index=False)["quantitykwh"]
-            .sum()
-            .sort_values("quantitykwh", ascending=False)
-        )
+    prod_group_sum = _rows_for(prod_totals, [chosen_year])
+
+    if not prod_group_sum.empty:
         fig_prod_pie = px.pie(
             prod_group_sum,
             values="quantitykwh",
@@ -198,11 +228,11 @@ with col_prod:
 # =========================================================
 # RIGHT: CONSUMPTION
 # =========================================================
-with col_cons:
+@st.fragment
+def consumption_panel(cons_area: pd.DataFrame, cons_totals: pd.DataFrame, cons_groups: list[str], chosen_area: str, chosen_year: int, chosen_month: str):
     st.header("🏠 Consumption")
 
     group_col = "consumptiongroup" if "consumptiongroup" in cons_area.columns else None
-    cons_groups = sorted(cons_area[group_col].dropna().unique().tolist()) if group_col else []
 
     st.subheader("Daily consumption over time")
     sel_cons_groups = st.pills(
@@ -231,7 +261,13 @@ with col_cons:
             title=f"{chosen_area} – {chosen_month} {chosen_year} (daily sum)",
             labels={"date": "Date", "quantitykwh": "kWh/day", "consumptiongroup": "Group"},
         )
-        fig_cons_line.update_layout(height=360, margin=dict(l=20, r=20, t=60, b=40), hovermode="x unified")
+        fig_cons_line.update_layout(
+            height=360,
+            margin=dict(l=20, r=20, t=60, b=40),
+            hovermode="x unified",
+            # keep zoom/pan while toggling groups, reset when the period changes
+            uirevision=f"{chosen_area}-{chosen_year}-{chosen_month}",
+        )
         st.plotly_chart(fig_cons_line, use_container_width=True)
     else:
         st.write("No consume data for chosen combination.")
@@ -239,16 +275,9 @@ with col_cons:
     st.divider()
 
     st.subheader("Total consumption per group (year)")
-    cons_year_df = cons_area.copy()
-    if "year" in cons_year_df.columns:
-        cons_year_df = cons_year_df[cons_year_df["year"] == chosen_year]
-
-    if not cons_year_df.empty and group_col:
-        cons_group_sum = (
-            cons_year_df.groupby(group_col, as_index=False)["quantitykwh"]
-            .sum()
-            .sort_values("quantitykwh", ascending=False)
-        )
+    cons_group_sum = _rows_for(cons_totals, [chosen_year])
+
+    if not cons_group_sum.empty:
         fig_cons_pie = px.pie(
             cons_group_sum,
             values="quantitykwh",
@@ -267,6 +296,15 @@ with col_cons:
         st.write("No consume data for pie chart.")
 
 
+col_prod, col_cons = st.columns(2, gap="large")
+
+with col_prod:
+    production_panel(prod_area, prod_totals, prod_options["groups"], chosen_area, chosen_year, chosen_month)
+
+with col_cons:
+    consumption_panel(cons_area, cons_totals, cons_options["groups"], chosen_area, chosen_year, chosen_month)
+
+
 # Data source expander
 with st.expander("Data source"):
     st.markdown(
@@ -6,6 +6,7 @@ import plotly.express as px
 from utils.constants import city_data_df
 from utils.weather_data_fetcher import get_weather_data
 from utils.ui_helpers import choose_price_area
+from utils.downsample import downsample_frame
 
 st.set_page_config(page_title="Weather Explorer", layout="wide", page_icon="🌤️")
 st.title("🌤️ Weather Data Explorer")
@@ -17,9 +18,6 @@ chosen_area, row = choose_price_area()
 # Year selection
 year = st.selectbox("Select Year", [2021, 2022, 2023, 2024], index=0)
 
-# Fetch weather data
-df = get_weather_data(row["Latitude"], row["Longitude"], year=year)
-
 # Mapping column names to user-friendly labels
 column_names = {
     "temperature_2m": "Temperature (°C)",
@@ -28,7 +26,36 @@ column_names = {
     "wind_gusts_10m": "Wind Gusts (m/s)",
     "wind_direction_10m": "Wind Direction (°)"
 }
-df.columns = [column_names.get(col, col) for col in df.columns]
+
+
+@st.cache_data(show_spinner=False)
+def weather_view(latitude, longitude, year):
+    """Weather data with user-friendly column names."""
+    df = get_weather_data(latitude, longitude, year=year)
+    df.columns = [column_names.get(col, col) for col in df.columns]
+    return df
+
+
+@st.cache_data(show_spinner=False)
+def january_view(latitude, longitude, year):
+    """January rows of weather_view."""
+    df = weather_view(latitude, longitude, year)
+    # Sorted index - January is the rows between the two month starts
+    lo, hi = df.index.searchsorted([pd.Timestamp(year, 1, 1), pd.Timestamp(year, 2, 1)])
+    return df.iloc[lo:hi]
+
+
+@st.cache_data(show_spinner=False)
+def month_options(latitude, longitude, year):
+    """'YYYY-MM' labels for the months covered by the data."""
+    df = get_weather_data(latitude, longitude, year=year)
+    # Hourly data with a sorted index - every month from the first to the last row is present
+    first, last = df.index[0].to_period("M"), df.index[-1].to_period("M")
+    return pd.period_range(first, last, freq="M").strftime("%Y-%m").tolist()
+
+
+# Fetch weather data
+df = weather_view(row["Latitude"], row["Longitude"], year)
 
 # Create tabs
 tab1, tab2 = st.tabs(["📊 Data Visualizer", "📅 January Overview"])
@@ -42,34 +69,41 @@ with tab1:
     selected_col = st.selectbox("Select column(s) to plot:", options)
     
     # Month range selection
-    months = sorted(df.index.to_period("M").unique().strftime("%Y-%m"))
+    months = month_options(row["Latitude"], row["Longitude"], year)
     selected_months = st.select_slider(
         "Select months range:",
         options=months,
         value=(months[0], months[-1])
     )
     
-    # Filter data
-    start, end = pd.Period(selected_months[0]), pd.Period(selected_months[1])
-    mask = (df.index.to_period("M") >= start) & (df.index.to_period("M") <= end)
-    df_subset = df.loc[mask]
+    # Filter data - index is sorted, so the month range is one contiguous slice
+    start_ts = pd.Timestamp(selected_months[0])
+    end_ts = pd.Timestamp(selected_months[1]) + pd.offsets.MonthBegin(1)
+    lo, hi = df.index.searchsorted([start_ts, end_ts])
+    df_subset = df.iloc[lo:hi]
+
+    # Thin long ranges with LTTB before plotting - the line looks the same with far fewer points
+    plot_cols = df_subset.columns.tolist() if selected_col == "All columns" else [selected_col]
+    df_plot = downsample_frame(df_subset, plot_cols)
     
-    # Plot with Plotly
+    # Plot with Plotly - WebGL lines, since "All columns" over a long range is several thousand points per line
     if selected_col == "All columns":
         fig = px.line(
-            df_subset.reset_index(),
+            df_plot.reset_index(),
             x='time',
-            y=df_subset.columns.tolist(),
+            y=plot_cols,
             title=f"Weather Data - {chosen_area} ({year})",
-            labels={'value': 'Value', 'time': 'Time', 'variable': 'Variable'}
+            labels={'value': 'Value', 'time': 'Time', 'variable': 'Variable'},
+            render_mode='webgl'
         )
     else:
         fig = px.line(
-            df_subset.reset_index(),
+            df_plot.reset_index(),
             x='time',
             y=selected_col,
             title=f"{selected_col} - {chosen_area} ({year})",
-            labels={selected_col: selected_col, 'time': 'Time'}
+            labels={selected_col: selected_col, 'time': 'Time'},
+            render_mode='webgl'
         )
     
     fig.update_layout(
@@ -87,21 +121,14 @@ with tab2:
     st.markdown("Quick overview of January weather patterns with inline sparklines.")
     
     # Filter January data
-    january = df.loc[f"{year}-01"]
+    january = january_view(row["Latitude"], row["Longitude"], year)
     
-    # Create table with sparklines
+    # Create table with sparklines - one row per variable
     january_table = pd.DataFrame({
-        "Temperature (°C)": [january["Temperature (°C)"].values],
-        "Precipitation (mm)": [january["Precipitation (mm)"].values],
-        "Wind Speed (m/s)": [january["Wind Speed (m/s)"].values],
-        "Wind Gusts (m/s)": [january["Wind Gusts (m/s)"].values],
-        "Wind Direction (°)": [january["Wind Direction (°)"].values],
+        "Variable": list(column_names.values()),
+        "Values": [january[col].to_numpy() for col in column_names.values()],
     })
     
-    # Transpose and format
-    january_table = january_table.T.reset_index()
-    january_table.columns = ["Variable", "Values"]
-    
     # Display with line chart column
     st.dataframe(
         january_table,
@@ -2,23 +2,59 @@ import streamlit as st
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
+import pandas as pd
 from statsmodels.tsa.seasonal import STL
 from scipy.signal import spectrogram
-from utils.load_energy_data import load_energy_data
+from utils.load_energy_data import load_energy_data, load_energy_by_area, ENERGY_VIEW_TTL
 from utils.ui_helpers import choose_price_area
+from utils.downsample import lttb_indices
 
 # page title and header
 st.set_page_config(page_title="Energy Decomposition", layout="wide", page_icon="📈")
 st.title("📈 Energy Decomposition")
 st.markdown("Analyze energy trends, seasonality, and patterns using STL decomposition and spectrograms.")
-# load energy data from utils/load_energy_data.py
-df = load_energy_data()
+
+# cached computations - reruns from tab/widget clicks reuse results for the same area and group
+@st.cache_data(show_spinner=False, ttl=ENERGY_VIEW_TTL)
+def production_groups() -> list[str]:
+    """Production groups in the data, in order of appearance."""
+    return load_energy_data()['productiongroup'].unique().tolist()
+
+
+@st.cache_data(show_spinner=False, ttl=ENERGY_VIEW_TTL)
+def area_group_series(area: str, group: str) -> pd.Series:
+    """Hourly production for one area and group, sorted by time."""
+    df_area = load_energy_by_area()[area]
+    return df_area[df_area['productiongroup'] == group].set_index('starttime')['quantitykwh']
+
+
+@st.cache_data(show_spinner="Running STL decomposition...", ttl=ENERGY_VIEW_TTL)
+def compute_stl(area: str, group: str) -> pd.DataFrame:
+    """Observed, trend, seasonal and residual components of the STL decomposition."""
+    ts = area_group_series(area, group)
+    result = STL(ts, period=24, seasonal=13, trend=25, robust=False).fit()
+    return pd.DataFrame({
+        "observed": ts,
+        "trend": result.trend,
+        "seasonal": result.seasonal,
+        "resid": result.resid,
+    })
+
+
+@st.cache_data(show_spinner=False, ttl=ENERGY_VIEW_TTL)
+def compute_spectrogram(area: str, group: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Frequencies, segment times and power in dB of the spectrogram."""
+    # contiguous float32 keeps the many short FFTs at half the memory traffic
+    ts = np.ascontiguousarray(area_group_series(area, group).to_numpy(np.float32))
+    f, t_vals, Sxx = spectrogram(ts, fs=1, nperseg=24, noverlap=12)
+    return f, t_vals, 10 * np.log10(Sxx + 1e-10)
+
 
 # choosing area using utils/choose
 chosen_area, row = choose_price_area()
 
 # select production group
-all_groups = df['productiongroup'].unique().tolist()
+all_groups = production_groups()
 selected_group = st.selectbox("Select production group:", all_groups)
 
 # Creating tabs for STL and Spectrogram
@@ -27,19 +63,14 @@ tab1, tab2 = st.tabs(["STL Decomposition", "Spectrogram"])
 with tab1:
     st.subheader(f"STL Decomposition for {selected_group} in {chosen_area}")  
     
-    # Filter data
-    df_filtered = df[(df['area'] == chosen_area) & (df['productiongroup'] == selected_group)].copy()
-    df_filtered = df_filtered.sort_values('starttime')
-    
     # Create time series
-    ts = df_filtered.set_index('starttime')['quantitykwh']
+    ts = area_group_series(chosen_area, selected_group)
 
     # Check if time series is long enough and perform STL
     if len(ts) < 24:
         st.write("Time series too short for STL decomposition.")
     else:
-        stl = STL(ts, period=24, seasonal=13, trend=25, robust=False)
-        result = stl.fit()
+        result = compute_stl(chosen_area, selected_group)
 
         # Create Plotly subplots
         fig = make_subplots(
@@ -49,23 +80,22 @@ with tab1:
             vertical_spacing=0.08
         )
         
-        # Add traces
-        fig.add_trace(
-            go.Scatter(x=ts.index, y=ts.values, mode='lines', name='Observed', line=dict(color='blue')),
-            row=1, col=1
-        )
-        fig.add_trace(
-            go.Scatter(x=result.trend.index, y=result.trend.values, mode='lines', name='Trend', line=dict(color='orange')),
-            row=2, col=1
-        )
-        fig.add_trace(
-            go.Scatter(x=result.seasonal.index, y=result.seasonal.values, mode='lines', name='Seasonal', line=dict(color='green')),
-            row=3, col=1
-        )
-        fig.add_trace(
-            go.Scatter(x=result.resid.index, y=result.resid.values, mode='lines', name='Residual', line=dict(color='red')),
-            row=4, col=1
-        )
+        # Add traces - each component is thinned with LTTB on its own so every panel keeps its peaks
+        components = [
+            ("observed", "Observed", "blue"),
+            ("trend", "Trend", "orange"),
+            ("seasonal", "Seasonal", "green"),
+            ("resid", "Residual", "red"),
+        ]
+        # Plain NumPy arrays (float32 values) so Plotly doesn't convert pandas objects per trace
+        idx = result.index.to_numpy('datetime64[ns]')
+        for row_no, (col, name, color) in enumerate(components, start=1):
+            values = result[col].to_numpy(np.float32)
+            keep = lttb_indices(values)
+            fig.add_trace(
+                go.Scatter(x=idx[keep], y=values[keep], mode='lines', name=name, line=dict(color=color)),
+                row=row_no, col=1
+            )
         
         # Update layout
         fig.update_xaxes(title_text="Time", row=4, col=1)
@@ -80,16 +110,11 @@ with tab1:
 with tab2:
     st.subheader(f"Spectrogram for {selected_group} in {chosen_area}")
     
-    # Filter data and create time series with timestamps
-    ts_series = df_filtered.set_index('starttime')['quantitykwh']
-    ts = ts_series.values
-    
     # Check if time series is long enough and compute spectrogram
-    if len(ts) < 24:
+    if len(area_group_series(chosen_area, selected_group)) < 24:
         st.write("Time series too short for spectrogram.")
     else:
-        f, t_vals, Sxx = spectrogram(ts, fs=1, nperseg=24, noverlap=12)
-        Sxx_plot = 10 * np.log10(Sxx + 1e-10)
+        f, t_vals, Sxx_plot = compute_spectrogram(chosen_area, selected_group)
         
         # Create Plotly heatmap
         fig = go.Figure(data=go.Heatmap(
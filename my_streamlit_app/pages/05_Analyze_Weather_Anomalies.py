@@ -1,15 +1,13 @@
 import streamlit as st
  # ...existing code...
-import pandas as pd
 import plotly.graph_objects as go
 import numpy as np
 
 # imports for DCT and LOF
-from scipy.fftpack import dct, idct
+from scipy.fft import dct, idct
 from sklearn.neighbors import LocalOutlierFactor
 
 # imports from utils
-from utils.constants import city_data_df
 from utils.weather_data_fetcher import get_weather_data
 from utils.ui_helpers import choose_price_area
 
@@ -18,60 +16,121 @@ st.title("⚠️ Weather Anomalies Detection")
 st.markdown("Detect unusual weather patterns using Statistical Process Control (SPC) for temperature and Local Outlier Factor (LOF) for precipitation.")
 st.info("💡 Tip: Adjust the detection parameters to find different types of anomalies.")
 
+# only these columns are used on this page, so the rest aren't requested or decoded
+ANOMALY_VARIABLES = ("temperature_2m", "precipitation")
 
-# Krever valgt prisområde
-chosen_area, row = choose_price_area()
 
-# Year selection
-year = st.selectbox("Select Year", [2021, 2022, 2023, 2024], index=0)
+@st.cache_data(show_spinner=False)
+def anomaly_frame(latitude, longitude, year):
+    """Weather data with the time index as a 'date' column, as used by the plots."""
+    df = get_weather_data(latitude, longitude, year=year, variables=ANOMALY_VARIABLES)
+    return df.reset_index().rename(columns={"time": "date"})
 
-# Load data 
-df = get_weather_data(row["Latitude"], row["Longitude"], year=year)
-df = df.reset_index().rename(columns={"time":"date"})
 
-# Tabs for temperature and precipitation
-tab1, tab2 = st.tabs(["Temperature (SPC)", "Precipitation (LOF)"])
+@st.cache_data(show_spinner=False)
+def temperature_dct(latitude, longitude, year):
+    """Forward DCT of the hourly temperature - independent of both SPC sliders."""
+    df = get_weather_data(latitude, longitude, year=year, variables=ANOMALY_VARIABLES)
+    temps = df["temperature_2m"].to_numpy()
+    return df.index, temps, dct(temps, norm='ortho', workers=-1)
 
-with tab1:
-    st.subheader("Temperature - Seasonal Adjusted with DCT and SPC")
-    
-    # Sliders for parameters for SPC
-    cutoff = st.slider("High-pass DCT cutoff", min_value=1, max_value=200, value=50)
-    n_std = st.slider("Number of MADs for SPC boundaries", min_value=1, max_value=5, value=3)
 
-    # Compute seasonal adjusted temperature using DCT
-    temps = df["temperature_2m"].to_numpy()
-    dates = pd.to_datetime(df["date"])
-    temps_dct = dct(temps, norm='ortho')
+@st.cache_data(show_spinner=False)
+def seasonal_adjustment(latitude, longitude, year, cutoff):
+    """High-passed temperature with its median and absolute deviations - depends on cutoff only."""
+    _, _, temps_dct = temperature_dct(latitude, longitude, year)  # cache_data hands back a copy, safe to modify
     temps_dct[:cutoff] = 0  # High-pass filter - set low frequencies to 0 (not 50)
-    temps_satv = idct(temps_dct, norm='ortho')
+    temps_satv = idct(temps_dct, norm='ortho', workers=-1)
     
     # Robust statistics with MAD (on seasonally adjusted)
+    # The absolute deviations feed both the MAD and the outlier test, so they are computed once
     median_satv = np.median(temps_satv)
-    mad_satv = np.median(np.abs(temps_satv - median_satv))
+    deviation = np.abs(temps_satv - median_satv)
+    return temps_satv, median_satv, deviation, np.median(deviation)
+
+
+@st.cache_data(show_spinner=False)
+def spc_anomalies(latitude, longitude, year, cutoff, n_std):
+    """
+    Seasonally adjust temperature with a DCT high-pass and flag SPC outliers (median +/- n_std MADs).
+    Returns a dict with dates, temps, upper/lower boundaries and the boolean outlier mask.
+    Changing only n_std reuses the cached transform and statistics.
+    """
+    dates, temps, _ = temperature_dct(latitude, longitude, year)
+    temps_satv, median_satv, deviation, mad_satv = seasonal_adjustment(latitude, longitude, year, cutoff)
+
     upper_limit_satv = median_satv + n_std * mad_satv
     lower_limit_satv = median_satv - n_std * mad_satv
+    outliers = deviation > n_std * mad_satv
     
     # Trim edge effects (first and last 0.25% of data)
     # Edge effects can distort the detection, so we exclude them
     edge_trim = int(len(temps_satv) * 0.0025)
-    temps_satv_trimmed = temps_satv.copy()
-    temps_satv_trimmed[:edge_trim] = np.nan
-    temps_satv_trimmed[-edge_trim:] = np.nan
-    
-    outliers = (temps_satv_trimmed > upper_limit_satv) | (temps_satv_trimmed < lower_limit_satv)
+    outliers[:edge_trim] = False
+    outliers[len(outliers) - edge_trim:] = False
     
     # Calculate boundaries relative to original temperature
     # The boundaries follow the seasonal pattern (inverse of high-pass)
     temps_seasonal = temps - temps_satv  # Extract seasonal component
-    upper_limit_original = temps_seasonal + upper_limit_satv
-    lower_limit_original = temps_seasonal + lower_limit_satv
+    return {
+        "dates": dates,
+        "temps": temps,
+        "upper": temps_seasonal + upper_limit_satv,
+        "lower": temps_seasonal + lower_limit_satv,
+        "outliers": outliers,
+    }
+
+
+@st.cache_data(show_spinner=False)
+def lof_scores(latitude, longitude, year, n_neighbors):
+    """LOF scores (negative_outlier_factor_) of each precipitation hour - depends on n_neighbors only."""
+    df = get_weather_data(latitude, longitude, year=year, variables=ANOMALY_VARIABLES)
+    # sklearn's KDTree works in float64, so hand it a contiguous float64 column it can use without copying
+    X = np.ascontiguousarray(df["precipitation"].to_numpy(np.float64).reshape(-1, 1))
+    lof = LocalOutlierFactor(n_neighbors=n_neighbors, algorithm="kd_tree", n_jobs=-1).fit(X)
+    return lof.negative_outlier_factor_
+
+
+@st.cache_data(show_spinner=False)
+def lof_anomalies(latitude, longitude, year, n_neighbors, contamination):
+    """
+    Boolean mask of precipitation hours flagged by Local Outlier Factor.
+    Same threshold as fit_predict with this contamination, but moving the contamination slider doesn't refit.
+    """
+    scores = lof_scores(latitude, longitude, year, n_neighbors)
+    return scores < np.percentile(scores, 100.0 * contamination)
+
+
+# Krever valgt prisområde
+chosen_area, row = choose_price_area()
+
+# Year selection
+year = st.selectbox("Select Year", [2021, 2022, 2023, 2024], index=0)
+
+# Load data 
+df = anomaly_frame(row["Latitude"], row["Longitude"], year)
+
+# Tabs for temperature and precipitation
+tab1, tab2 = st.tabs(["Temperature (SPC)", "Precipitation (LOF)"])
+
+with tab1:
+    st.subheader("Temperature - Seasonal Adjusted with DCT and SPC")
+    
+    # Sliders for parameters for SPC
+    cutoff = st.slider("High-pass DCT cutoff", min_value=1, max_value=200, value=50)
+    n_std = st.slider("Number of MADs for SPC boundaries", min_value=1, max_value=5, value=3)
+
+    # Seasonal adjustment and SPC boundaries (cached per area, year and slider values)
+    spc = spc_anomalies(row["Latitude"], row["Longitude"], year, cutoff, n_std)
+    dates, temps, outliers = spc["dates"], spc["temps"], spc["outliers"]
+    upper_limit_original, lower_limit_original = spc["upper"], spc["lower"]
     
     # Plotting temperature with outliers using Plotly
+    # WebGL traces (Scattergl) - a year of hourly points draws far faster than as SVG
     fig = go.Figure()
     
     # Add temperature trace
-    fig.add_trace(go.Scatter(
+    fig.add_trace(go.Scattergl(
         x=dates, y=temps,
         mode='lines',
         name='Temperature',
@@ -80,7 +139,7 @@ with tab1:
     ))
     
     # Add outliers
-    fig.add_trace(go.Scatter(
+    fig.add_trace(go.Scattergl(
         x=dates[outliers], y=temps[outliers],
         mode='markers',
         name='Outliers',
@@ -88,14 +147,14 @@ with tab1:
     ))
     
     # Add SPC boundaries (following original temperature pattern)
-    fig.add_trace(go.Scatter(
+    fig.add_trace(go.Scattergl(
         x=dates, y=upper_limit_original,
         mode='lines',
         name='Upper boundary',
         line=dict(color='green', width=2, dash='dash')
     ))
     
-    fig.add_trace(go.Scatter(
+    fig.add_trace(go.Scattergl(
         x=dates, y=lower_limit_original,
         mode='lines',
         name='Lower boundary',
@@ -125,18 +184,15 @@ with tab2:
     n_neighbors = st.slider("LOF neighbors", min_value=5, max_value=100, value=50)
     contamination = st.slider("LOF contamination", min_value=0.001, max_value=0.05, value=0.01, step=0.001)
 
-    # Compute LOF
-    X = df["precipitation"].values.reshape(-1,1)
-    lof = LocalOutlierFactor(n_neighbors=n_neighbors, contamination=contamination)
-    y_pred = lof.fit_predict(X)
-    anomalies = y_pred == -1
+    # Compute LOF (cached per area, year and slider values)
+    anomalies = lof_anomalies(row["Latitude"], row["Longitude"], year, n_neighbors, contamination)
     outlier_df = df.loc[anomalies, ["date","precipitation"]]
 
     # Plotting precipitation with outliers using Plotly
     fig = go.Figure()
     
     # Add precipitation trace
-    fig.add_trace(go.Scatter(
+    fig.add_trace(go.Scattergl(
         x=dates, y=df["precipitation"],
         mode='lines',
         name='Precipitation',
@@ -145,7 +201,7 @@ with tab2:
     ))
     
     # Add anomalies
-    fig.add_trace(go.Scatter(
+    fig.add_trace(go.Scattergl(
         x=outlier_df["date"], y=outlier_df["precipitation"],
         mode='markers',
         name='LOF anomalies',
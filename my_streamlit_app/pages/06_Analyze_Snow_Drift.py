@@ -10,6 +10,13 @@ from utils.snowdrift_calculations import (
     compute_average_sector
 )
 
+# Wind rose layout - 16 compass sectors, fixed
+NUM_SECTORS = 16
+SECTOR_ANGLES_DEG = np.arange(0, 360, 360 / NUM_SECTORS, dtype=np.float32)
+SECTOR_WIDTHS = np.full(NUM_SECTORS, 360 / NUM_SECTORS, dtype=np.float32)
+SECTOR_DIRECTIONS = ['N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE',
+                     'S', 'SSW', 'SW', 'WSW', 'W', 'WNW', 'NW', 'NNW']
+
 # Page config
 st.set_page_config(page_title="Snow Drift Analysis", layout="wide", page_icon="❄️")
 st.title("❄️ Snow Drift Analysis")
@@ -102,6 +109,10 @@ with col2:
 st.divider()
 
 # Data loading
+# only the columns the snow drift calculations use, so wind gusts aren't requested or decoded
+SNOW_DRIFT_VARIABLES = ("temperature_2m", "precipitation", "wind_speed_10m", "wind_direction_10m")
+
+
 @st.cache_data(show_spinner=True)
 def load_multi_year_weather_data(latitude, longitude, start_year, end_year):
     """
@@ -109,16 +120,29 @@ def load_multi_year_weather_data(latitude, longitude, start_year, end_year):
     Caches the data to ensure we don't make redundant API calls.
     """
     years = list(range(start_year, end_year + 1))
-    df = get_weather_data(latitude, longitude, year=years)
+    df = get_weather_data(latitude, longitude, year=years, variables=SNOW_DRIFT_VARIABLES)
     # Reset index to make 'time' a column
     df = df.reset_index()
     # Define season: if month >= 7, season = current year; otherwise, season = previous year
-    df['season'] = df['time'].apply(
-        lambda dt: dt.year if dt.month >= 7 else dt.year - 1
-    )
+    years = df['time'].dt.year.to_numpy()
+    months = df['time'].dt.month.to_numpy()
+    df['season'] = np.where(months >= 7, years, years - 1)
     return df
 
 
+# Cached per location, year range and parameters - keyed on those instead of hashing the weather frame
+@st.cache_data(show_spinner=False)
+def cached_yearly_results(latitude, longitude, start_year, end_year, T, F, theta):
+    df = load_multi_year_weather_data(latitude, longitude, start_year, end_year)
+    return compute_yearly_results(df, T, F, theta)
+
+
+@st.cache_data(show_spinner=False)
+def cached_average_sector(latitude, longitude, start_year, end_year):
+    df = load_multi_year_weather_data(latitude, longitude, start_year, end_year)
+    return compute_average_sector(df)
+
+
 st.divider()
 
 # Data loading with error handling
@@ -141,52 +165,53 @@ with st.spinner(f"Loading weather data for {year_start}-{year_end}..."):
 
 # Calculations
 with st.spinner("Calculating snow drift..."):
-    yearly_results = compute_yearly_results(df, T, F, theta)
-    avg_sectors = compute_average_sector(df)
+    yearly_results = cached_yearly_results(lat, lon, year_start, year_end, T, F, theta)
+    avg_sectors = cached_average_sector(lat, lon, year_start, year_end)
 
 if yearly_results.empty:
     st.error("No complete seasons found in the selected year range.")
     st.stop()
 
 
-# Overall statistics
-overall_avg_kg = yearly_results['Qt (kg/m)'].mean()
-overall_avg_tonnes = overall_avg_kg / 1000
+# Overall statistics - Qt is converted to tonnes/m once and reused for the average and the chart
+qt_tonnes = yearly_results['Qt (kg/m)'].to_numpy() / 1000
+overall_avg_tonnes = qt_tonnes.mean()
 
 
 # Yearly plot
 st.subheader("📈 Snow Drift by Winter Season")
 st.caption("Each bar shows how much snow was transported during that winter (July to June)")
 
-# Prepare data for plotting
-yearly_results['Qt (tonnes/m)'] = yearly_results['Qt (kg/m)'] / 1000
-
-fig_yearly = go.Figure()
-
-fig_yearly.add_trace(go.Bar(
-    x=yearly_results['season'],
-    y=yearly_results['Qt (tonnes/m)'],
-    name='Qt (tonnes/m)',
-    marker_color='lightblue',
-    hovertemplate='<b>%{x}</b><br>Qt: %{y:.1f} tonnes/m<extra></extra>'
-))
-
-# Add average line
-fig_yearly.add_trace(go.Scatter(
-    x=yearly_results['season'],
-    y=[overall_avg_tonnes] * len(yearly_results),
-    mode='lines',
-    name='Average',
-    line=dict(color='red', dash='dash', width=2),
-    hovertemplate=f'Average: {overall_avg_tonnes:.1f} tonnes/m<extra></extra>'
-))
-
-fig_yearly.update_layout(
-    xaxis_title="Season (July-June)",
-    yaxis_title="Snow Transport Qt (tonnes/m)",
-    hovermode='x unified',
-    showlegend=True,
-    height=400
+# Float32 NumPy arrays are sent to the browser as compact binary (base64) arrays instead of JSON number lists
+qt_tonnes = qt_tonnes.astype(np.float32)
+
+# Traces and layout go into the Figure in one call, so it is validated once
+fig_yearly = go.Figure(
+    data=[
+        go.Bar(
+            x=yearly_results['season'],
+            y=qt_tonnes,
+            name='Qt (tonnes/m)',
+            marker_color='lightblue',
+            hovertemplate='<b>%{x}</b><br>Qt: %{y:.1f} tonnes/m<extra></extra>'
+        ),
+        # Average line
+        go.Scatter(
+            x=yearly_results['season'],
+            y=np.full(len(qt_tonnes), overall_avg_tonnes, dtype=np.float32),
+            mode='lines',
+            name='Average',
+            line=dict(color='red', dash='dash', width=2),
+            hovertemplate=f'Average: {overall_avg_tonnes:.1f} tonnes/m<extra></extra>'
+        ),
+    ],
+    layout=go.Layout(
+        xaxis_title="Season (July-June)",
+        yaxis_title="Snow Transport Qt (tonnes/m)",
+        hovermode='x unified',
+        showlegend=True,
+        height=400
+    )
 )
 
 st.plotly_chart(fig_yearly, use_container_width=True)
@@ -201,44 +226,38 @@ The **wind rose** shows which wind directions transport the most snow:
 """)
 
 # Convert sectors from kg/m to tonnes/m
-avg_sectors_tonnes = np.array(avg_sectors) / 1000.0
+avg_sectors_tonnes = np.asarray(avg_sectors, dtype=np.float32) / np.float32(1000)
 
 # Create polar plot
-num_sectors = 16
-angles = np.deg2rad(np.arange(0, 360, 360/num_sectors))
-directions = ['N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE',
-              'S', 'SSW', 'SW', 'WSW', 'W', 'WNW', 'NW', 'NNW']
-
 # Create bar chart in polar coordinates
-fig_rose = go.Figure()
-
-fig_rose.add_trace(go.Barpolar(
-    r=avg_sectors_tonnes,
-    theta=np.rad2deg(angles),
-    width=[360/num_sectors] * num_sectors,
-    marker=dict(
-        color=avg_sectors_tonnes,
-        colorscale='Blues',
-        showscale=True,
-        colorbar=dict(title="tonnes/m")
-    ),
-    hovertemplate='<b>%{text}</b><br>Transport: %{r:.2f} tonnes/m<extra></extra>',
-    text=directions
-))
-
-fig_rose.update_layout(
-    polar=dict(
-        radialaxis=dict(visible=True, showticklabels=True),
-        angularaxis=dict(
-            direction='clockwise',
-            period=360,
-            tickmode='array',
-            tickvals=np.rad2deg(angles),
-            ticktext=directions
-        )
+fig_rose = go.Figure(
+    data=go.Barpolar(
+        r=avg_sectors_tonnes,
+        theta=SECTOR_ANGLES_DEG,
+        width=SECTOR_WIDTHS,
+        marker=dict(
+            color=avg_sectors_tonnes,
+            colorscale='Blues',
+            showscale=True,
+            colorbar=dict(title="tonnes/m")
+        ),
+        hovertemplate='<b>%{text}</b><br>Transport: %{r:.2f} tonnes/m<extra></extra>',
+        text=SECTOR_DIRECTIONS
     ),
-    showlegend=False,
-    height=600
+    layout=go.Layout(
+        polar=dict(
+            radialaxis=dict(visible=True, showticklabels=True),
+            angularaxis=dict(
+                direction='clockwise',
+                period=360,
+                tickmode='array',
+                tickvals=SECTOR_ANGLES_DEG,
+                ticktext=SECTOR_DIRECTIONS
+            )
+        ),
+        showlegend=False,
+        height=600
+    )
 )
 
 st.plotly_chart(fig_rose, use_container_width=True)
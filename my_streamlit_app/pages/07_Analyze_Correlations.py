@@ -1,15 +1,13 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
 import numpy as np
 
 # Import utility functions
 from utils.ui_helpers import choose_price_area
-from utils.load_energy_data import load_energy_data, load_consumption_data
+from utils.load_energy_data import load_energy_by_area, load_consumption_by_area, ENERGY_VIEW_TTL
 from utils.weather_data_fetcher import get_weather_data
-from utils.constants import city_data_df
+from utils.rolling_corr import rolling_corr
 
 st.set_page_config(page_title="Correlation Analysis", layout="wide", page_icon="🔗")
 st.title("🔗 Weather-Energy Correlation Analysis")
@@ -21,6 +19,66 @@ This page shows the **sliding window correlation** between weather variables and
 A sliding window correlation calculates correlation in moving time windows, revealing how the relationship changes over time.
 """)
 
+
+@st.cache_data(show_spinner=False, ttl=ENERGY_VIEW_TTL)
+def hourly_energy(energy_type: str, area: str, group: str, year: int) -> pd.Series:
+    """Hourly kWh for one area, group ("All" sums all groups) and year, indexed by starttime."""
+    if energy_type == "production":
+        energy_by_area = load_energy_by_area()
+        group_col = 'productiongroup'
+    else:
+        energy_by_area = load_consumption_by_area()
+        group_col = 'consumptiongroup'
+
+    # Rows are in starttime order, so one year is a contiguous slice - no copy or date parsing
+    energy_df = energy_by_area[area]
+    lo, hi = energy_df['starttime'].searchsorted([pd.Timestamp(year, 1, 1), pd.Timestamp(year + 1, 1, 1)])
+    energy_df = energy_df.iloc[lo:hi]
+
+    if group != "All":
+        energy_df = energy_df[energy_df[group_col] == group]
+    # A single group usually has one row per hour - then the rows already are the (sorted) series
+    if energy_df['starttime'].is_unique:
+        return pd.Series(energy_df['quantitykwh'].to_numpy(),
+                         index=pd.Index(energy_df['starttime'], name='starttime'), name='quantitykwh')
+    return energy_df.groupby('starttime')['quantitykwh'].sum()
+
+
+# Only depends on the data selection, so moving the window or lag sliders reuses it
+@st.cache_data(show_spinner=False, ttl=ENERGY_VIEW_TTL)
+def aligned_series(latitude, longitude, energy_type, area, group, year, weather_var, resample_to):
+    """Weather and energy series over their common period at the chosen resolution, plus that period."""
+    # Weather data already has time as index from get_weather_data()
+    weather_series = get_weather_data(latitude, longitude, year).sort_index()[weather_var]
+    energy_series = hourly_energy(energy_type, area, group, year)
+
+    # Align data - find overlapping time range
+    start_time = max(weather_series.index.min(), energy_series.index.min())
+    end_time = min(weather_series.index.max(), energy_series.index.max())
+
+    # Both indexes are sorted, so these are slices rather than boolean-mask copies
+    weather_series = weather_series.loc[start_time:end_time]
+    energy_series = energy_series.loc[start_time:end_time]
+
+    # Weather: hourly with gaps interpolated. Energy: summed straight into the selected resolution
+    # (missing hours count as 0 either way, so there's no need for an hourly pass first).
+    # The API already returns a regular hourly series, so those passes only run when something is missing
+    if weather_series.index.inferred_freq != "h":
+        weather_series = weather_series.resample('h').mean()
+    if weather_series.hasnans:
+        weather_series = weather_series.interpolate()
+    if resample_to != "h" or energy_series.index.inferred_freq != "h":
+        energy_series = energy_series.resample(resample_to).sum()
+
+    # Now resample weather to selected resolution if not hourly
+    if resample_to != "h":
+        weather_series = weather_series.resample(resample_to).mean()
+
+    # Put both on one index, so the lag is a plain shift by whole steps
+    weather_series, energy_series = weather_series.align(energy_series, join="outer")
+    return weather_series, energy_series, start_time, end_time
+
+
 # Price area selector
 chosen_area, city_info = choose_price_area(show_selector=True)
 
@@ -82,7 +140,7 @@ with col3:
                                   help="Resample data to reduce noise")
 
 # Map resolution to pandas frequency
-freq_map = {"Hourly": "H", "Daily": "D", "Weekly": "W"}
+freq_map = {"Hourly": "h", "Daily": "D", "Weekly": "W"}
 resample_to = freq_map[resample_freq]
 
 st.divider()
@@ -92,69 +150,28 @@ with st.spinner(f"Loading weather data for {city_name}..."):
     weather_df = get_weather_data(lat, lon, year)
 
 with st.spinner(f"Loading energy data for {chosen_area}..."):
-    if energy_type == "production":
-        energy_df = load_energy_data()
-    else:
-        energy_df = load_consumption_data()
-    
-    # Filter by area and year
-    energy_df = energy_df[energy_df['area'] == chosen_area].copy()
-    energy_df['year'] = pd.to_datetime(energy_df['starttime']).dt.year
-    energy_df = energy_df[energy_df['year'] == year].copy()
-    
-    # Filter by group
-    group_col = 'productiongroup' if energy_type == "production" else 'consumptiongroup'
-    if energy_group != "All":
-        energy_df = energy_df[energy_df[group_col] == energy_group].copy()
-    else:
-        # Sum all groups
-        energy_df = energy_df.groupby('starttime')['quantitykwh'].sum().reset_index()
+    # Hourly series for area, group and year (aggregated to hourly in case there are duplicates)
+    energy_series = hourly_energy(energy_type, chosen_area, energy_group, year)
 
 if weather_df.empty:
     st.error("No weather data available.")
     st.stop()
 
-if energy_df.empty:
+if energy_series.empty:
     st.error("No energy data available for the selected parameters.")
     st.stop()
 
-# Prepare time series
-# Weather data already has time as index from get_weather_data()
-weather_df = weather_df.sort_index()
-
-energy_df['starttime'] = pd.to_datetime(energy_df['starttime'])
-energy_df = energy_df.sort_values('starttime')
-
-# Aggregate energy data to hourly (in case there are duplicates)
-if 'quantitykwh' in energy_df.columns:
-    energy_series = energy_df.groupby('starttime')['quantitykwh'].sum()
-else:
-    energy_series = energy_df.set_index('starttime')['quantitykwh']
-
 # Get weather series
 if weather_var not in weather_df.columns:
     st.error(f"Weather variable '{weather_var}' not found in data.")
     st.stop()
 
-weather_series = weather_df[weather_var]
-
-# Align data - find overlapping time range
-start_time = max(weather_series.index.min(), energy_series.index.min())
-end_time = min(weather_series.index.max(), energy_series.index.max())
+# Prepare time series (aligned and resampled, cached per data selection)
+weather_series, energy_series, start_time, end_time = aligned_series(
+    lat, lon, energy_type, chosen_area, energy_group, year, weather_var, resample_to)
 
-weather_series = weather_series[(weather_series.index >= start_time) & (weather_series.index <= end_time)]
-energy_series = energy_series[(energy_series.index >= start_time) & (energy_series.index <= end_time)]
-
-# Resample to hourly frequency (fill missing values)
-weather_series = weather_series.resample('h').mean().interpolate()
-energy_series = energy_series.resample('h').sum()
-
-# Now resample to selected resolution if not hourly
+# Adjust window size and lag for the new resolution
 if resample_to != "h":
-    weather_series = weather_series.resample(resample_to).mean()
-    energy_series = energy_series.resample(resample_to).sum()
-    
-    # Adjust window size and lag for the new resolution
     if resample_to == "D":  # Daily
         window_size_adjusted = max(1, window_size // 24)
         lag_adjusted = lag // 24
@@ -165,22 +182,15 @@ else:
     window_size_adjusted = window_size
     lag_adjusted = lag
 
-# Apply lag to weather data
+# Apply lag to weather data: move the values lag_adjusted steps along the shared index
+# (NaN where nothing is shifted in), so no index arithmetic or re-alignment is needed
 if lag_adjusted != 0:
-    if resample_to == "h":
-        weather_series_lagged = weather_series.copy()
-        weather_series_lagged.index = weather_series_lagged.index + timedelta(hours=lag_adjusted)
-    elif resample_to == "D":
-        weather_series_lagged = weather_series.copy()
-        weather_series_lagged.index = weather_series_lagged.index + timedelta(days=lag_adjusted)
-    elif resample_to == "W":
-        weather_series_lagged = weather_series.copy()
-        weather_series_lagged.index = weather_series_lagged.index + timedelta(weeks=lag_adjusted)
+    weather_series_lagged = weather_series.shift(lag_adjusted)
 else:
     weather_series_lagged = weather_series
 
-# Calculate sliding window correlation
-correlation = energy_series.rolling(window=window_size_adjusted, center=True).corr(weather_series_lagged)
+# Calculate sliding window correlation (centered windows, from running sums)
+correlation = rolling_corr(energy_series, weather_series_lagged, window_size_adjusted)
 
 # Create visualization
 st.subheader(f"Sliding Window Correlation: {weather_var_label} vs {energy_var_label}")
@@ -188,35 +198,40 @@ st.subheader(f"Sliding Window Correlation: {weather_var_label} vs {energy_var_la
 # Create subplot figure
 fig = go.Figure()
 
-# Normalize series for visualization
-weather_norm = (weather_series - weather_series.mean()) / weather_series.std()
-energy_norm = (energy_series - energy_series.mean()) / energy_series.std()
+# Normalize series for visualization (on the plain arrays - same sample std as pandas, no index alignment)
+weather_values = weather_series.to_numpy()
+energy_values = energy_series.to_numpy()
+weather_norm = (weather_values - np.nanmean(weather_values)) / np.nanstd(weather_values, ddof=1)
+energy_norm = (energy_values - np.nanmean(energy_values)) / np.nanstd(energy_values, ddof=1)
+
+# WebGL traces for long (hourly) series - SVG gets slow with thousands of points per line
+Trace = go.Scattergl if len(correlation) > 2000 else go.Scatter
 
 # Creating one plot with dual y-axes for weather, energy, and correlation
 # Chosen weather variable
-fig.add_trace(go.Scatter(
-    x=weather_norm.index,
-    y=weather_norm.values,
+fig.add_trace(Trace(
+    x=weather_series.index,
+    y=weather_norm,
     name=weather_var_label,
     line=dict(color='blue', width=1),
     yaxis='y1',
-    customdata=weather_series.values,
+    customdata=weather_values,
     hovertemplate='%{x}<br>' + weather_var_label + ': %{customdata:.2f}<extra></extra>'
 ))
 
 # Chosen energy variable
-fig.add_trace(go.Scatter(
-    x=energy_norm.index,
-    y=energy_norm.values,
+fig.add_trace(Trace(
+    x=energy_series.index,
+    y=energy_norm,
     name=energy_var_label,
     line=dict(color='green', width=1),
     yaxis='y1',
-    customdata=energy_series.values,
+    customdata=energy_values,
     hovertemplate='%{x}<br>' + energy_var_label + ': %{customdata:.2f} kWh<extra></extra>'
 ))
 
 # Correlation between energy and weather variables
-fig.add_trace(go.Scatter(
+fig.add_trace(Trace(
     x=correlation.index,
     y=correlation.values,
     name='Correlation',
@@ -1,17 +1,18 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-from sklearn.preprocessing import StandardScaler
 from statsmodels.tsa.statespace.sarimax import SARIMAX
+import hashlib
 import warnings
 warnings.filterwarnings('ignore')
 
 # Import utility functions
 from utils.ui_helpers import choose_price_area
-from utils.load_energy_data import load_energy_data, load_consumption_data
+from utils.load_energy_data import load_energy_by_area, load_consumption_by_area, ENERGY_VIEW_TTL
 from utils.weather_data_fetcher import get_weather_data
-from utils.constants import city_data_df
+from utils.downsample import lttb_indices
 
 st.set_page_config(page_title="Energy Forecast", layout="wide", page_icon="🔮")
 st.title("🔮 SARIMAX Energy Forecasting")
@@ -54,6 +55,51 @@ def format_energy_value(v: float) -> str:
         return f"{v/1_000_000:,.2f} GWh/day"
     return f"{v/1_000_000_000:,.2f} TWh/day"
 
+
+@st.cache_data(show_spinner=False, ttl=ENERGY_VIEW_TTL)
+def hourly_energy(energy_type: str, area: str, group: str) -> pd.Series:
+    """Hourly kWh for one area and group ("Total" sums all groups), indexed by starttime."""
+    if energy_type == "Production":
+        energy_by_area = load_energy_by_area()
+        group_col = 'productiongroup'
+    else:
+        energy_by_area = load_consumption_by_area()
+        group_col = 'consumptiongroup'
+
+    energy_df = energy_by_area[area]
+    if group != "Total":
+        energy_df = energy_df[energy_df[group_col] == group]
+    return energy_df.groupby('starttime')['quantitykwh'].sum()
+
+
+# The fit only depends on the training data, model orders and start parameters - the horizon and confidence
+# level are applied afterwards with get_forecast, so changing those reuses the fitted model.
+# start_params is part of the cache key, so a cold fit and a warm-started fit are never mixed up
+@st.cache_resource(show_spinner=False, max_entries=16)
+def fit_sarimax(endog: pd.Series, exog: pd.DataFrame | None, order: tuple, seasonal_order: tuple,
+                start_params: tuple | None = None):
+    """Fitted SARIMAX results, shared between reruns with identical inputs.
+    start_params: optional (name, value) pairs from an earlier fit to start the optimizer from."""
+    model = SARIMAX(
+        endog,
+        exog=exog,
+        order=order,
+        seasonal_order=seasonal_order,
+        enforce_stationarity=False,
+        enforce_invertibility=False
+    )
+
+    # Warm start: parameters present in both models start from their earlier values, new ones from the defaults
+    if start_params is not None:
+        previous = pd.Series(dict(start_params))
+        defaults = pd.Series(model.start_params, index=model.param_names)
+        shared = defaults.index.intersection(previous.index)
+        defaults[shared] = previous[shared]
+        start_params = defaults.to_numpy()
+
+    return model.fit(start_params=start_params, disp=False, maxiter=200)
+
+
 # Configuration section
 col1, col2 = st.columns(2)
 with col1:
@@ -132,30 +178,11 @@ st.markdown("---")
 # Run forecast button
 if st.button("Run Forecast", type="primary"):
     with st.spinner("Loading and preparing data..."):
-        # Load energy data
-        if energy_type == "Production":
-            energy_df = load_energy_data()
-            group_col = 'productiongroup'
-        else:
-            energy_df = load_consumption_data()
-            group_col = 'consumptiongroup'
-        
-        # Filter by area
-        energy_df = energy_df[energy_df['area'] == chosen_area].copy()
-        
-        # Filter by group
-        if energy_group != "Total":
-            energy_df = energy_df[energy_df[group_col] == energy_group].copy()
-        
-        # Convert to datetime and filter date range
-        energy_df['starttime'] = pd.to_datetime(energy_df['starttime'])
-        energy_df = energy_df[
-            (energy_df['starttime'] >= pd.Timestamp(start_date)) &
-            (energy_df['starttime'] <= pd.Timestamp(end_date))
-        ].copy()
-        
-        # Aggregate to hourly
-        energy_series = energy_df.groupby('starttime')['quantitykwh'].sum().sort_index()
+        # Hourly series for the area and group (cached), then the date range as a slice of the sorted index
+        energy_series = hourly_energy(energy_type, chosen_area, energy_group)
+        lo = energy_series.index.searchsorted(pd.Timestamp(start_date), side='left')
+        hi = energy_series.index.searchsorted(pd.Timestamp(end_date), side='right')
+        energy_series = energy_series.iloc[lo:hi]
         
         if len(energy_series) < 24:
             st.error("Not enough data for the selected period. Please adjust your filters.")
@@ -173,15 +200,14 @@ if st.button("Run Forecast", type="primary"):
         exog_forecast = None
         
         if use_exog and len(exog_vars) > 0:
-            # Determine years needed
-            years_needed = list(range(start_date.year, end_date.year + 2))
+            # Determine years needed - the training years plus the forecast window,
+            # but never a year the archive can't have data for yet
+            forecast_end_year = (pd.Timestamp(end_date) + pd.Timedelta(days=forecast_horizon)).year
+            years_needed = list(range(start_date.year, min(forecast_end_year, datetime.now().year) + 1))
             weather_df = get_weather_data(lat, lon, years_needed)
             
-            # Filter to training period
-            weather_train = weather_df[
-                (weather_df.index >= pd.Timestamp(start_date)) &
-                (weather_df.index <= pd.Timestamp(end_date))
-            ][exog_vars].copy()
+            # Filter to training period - a label slice of the sorted index, only read from below so no copy
+            weather_train = weather_df.loc[pd.Timestamp(start_date):pd.Timestamp(end_date), exog_vars]
             
             # Resample to daily
             weather_train_daily = weather_train.resample('D').mean()
@@ -194,9 +220,13 @@ if st.button("Run Forecast", type="primary"):
                 .bfill())
             
             # Standardize exogenous variables to prevent numerical issues such as singular matrix errors
-            scaler = StandardScaler()
+            # (same as sklearn's StandardScaler: population std, constant columns only centred)
+            train_values = exog_train.to_numpy(np.float64)
+            exog_mean = train_values.mean(axis=0)
+            exog_std = train_values.std(axis=0)
+            exog_std[exog_std == 0] = 1.0
             exog_train_scaled = pd.DataFrame(
-                scaler.fit_transform(exog_train),
+                (train_values - exog_mean) / exog_std,
                 index=exog_train.index,
                 columns=exog_train.columns
             )
@@ -205,10 +235,7 @@ if st.button("Run Forecast", type="primary"):
             forecast_start = energy_daily.index[-1] + timedelta(days=1)
             forecast_end = forecast_start + timedelta(days=forecast_horizon - 1)
             
-            weather_forecast = weather_df[
-                (weather_df.index >= forecast_start) &
-                (weather_df.index <= forecast_end)
-            ][exog_vars].copy()
+            weather_forecast = weather_df.loc[forecast_start:forecast_end, exog_vars]
             
             exog_forecast = (
                 weather_forecast
@@ -219,7 +246,7 @@ if st.button("Run Forecast", type="primary"):
                 .bfill())
             
             # If we don't have future weather data, use last known values
-            if len(exog_forecast) < forecast_horizon:
+            if weather_forecast.empty:
                 st.warning("Future weather data not available. Using last known values for forecast.")
                 last_values = weather_train_daily.iloc[-1]
                 forecast_dates = pd.date_range(forecast_start, periods=forecast_horizon, freq='D')
@@ -229,9 +256,9 @@ if st.button("Run Forecast", type="primary"):
                     columns=exog_vars
                 )
             
-            # Standardize forecast exogenous variables using same scaler
+            # Standardize forecast exogenous variables using the training mean and std
             exog_forecast_scaled = pd.DataFrame(
-                scaler.transform(exog_forecast),
+                (exog_forecast.to_numpy(np.float64) - exog_mean) / exog_std,
                 index=exog_forecast.index,
                 columns=exog_forecast.columns
             )
@@ -241,17 +268,23 @@ if st.button("Run Forecast", type="primary"):
             # Use scaled exogenous variables if available
             exog_train_final = exog_train_scaled if use_exog and len(exog_vars) > 0 else None
             
-            # Fit SARIMAX model on SCALED energy data
-            model = SARIMAX(
-                energy_daily_scaled,
-                exog=exog_train_final,
-                order=(p, d, q),
-                seasonal_order=(P, D, Q, s),
-                enforce_stationarity=False,
-                enforce_invertibility=False
-            )
-            
-            results = model.fit(disp=False, maxiter=200)
+            # Warm start only when this session changes the orders on the same series: the first fit is cold,
+            # later new orders start from the previous fit. Orders seen before reuse their original start,
+            # so going back gives the same result. Kept per session - other users' fits never play a part
+            orders = ((p, d, q), (P, D, Q, s))
+            series_key = hashlib.blake2b(energy_daily_scaled.to_numpy().tobytes(), digest_size=16).hexdigest()
+            session_fits = st.session_state.get("sarimax_fits")
+            if session_fits is None or session_fits["series"] != series_key:
+                session_fits = {"series": series_key, "start": {}, "last_params": None}
+            warm_start = session_fits["start"].setdefault(orders, session_fits["last_params"])
+
+            # Fit SARIMAX model on SCALED energy data (cached per data, orders and start parameters)
+            results = fit_sarimax(energy_daily_scaled, exog_train_final, *orders, start_params=warm_start)
+            session_fits["last_params"] = tuple(zip(results.model.param_names, results.params))
+            st.session_state["sarimax_fits"] = session_fits
+            if warm_start is not None:
+                st.caption("ℹ️ The optimizer started from your previous fit's parameters, "
+                           "so results can differ slightly from a fresh fit with the same settings.")
             
             # Check for convergence warnings
             if hasattr(results, 'mle_retvals') and results.mle_retvals is not None:
@@ -284,47 +317,57 @@ if st.button("Run Forecast", type="primary"):
             # Plot results
             st.subheader("Forecast Results")
             
-            fig = go.Figure()
-            
-            # Historical data (unscaled for display)
-            fig.add_trace(go.Scatter(
-                x=energy_daily.index,
-                y=energy_daily.values,
-                mode='lines',
-                name='Historical',
-                line=dict(color='steelblue', width=2)
-            ))
-            
-            # Forecast
-            fig.add_trace(go.Scatter(
-                x=forecast_dates,
-                y=forecast_mean.values,
-                mode='lines',
-                name='Forecast',
-                line=dict(color='red', width=2, dash='dash')
-            ))
-            
-            # Confidence interval
-            fig.add_trace(go.Scatter(
-                x=forecast_dates,
-                y=forecast_ci.iloc[:, 0].values,
-                mode='lines',
-                name=f'{conf_level}% CI Lower',
-                line=dict(width=0),
-                showlegend=False,
-                hoverinfo='skip'
-            ))
-            
-            fig.add_trace(go.Scatter(
-                x=forecast_dates,
-                y=forecast_ci.iloc[:, 1].values,
-                mode='lines',
-                name=f'{conf_level}% CI Upper',
-                line=dict(width=0),
-                fillcolor='rgba(255, 0, 0, 0.2)',
-                fill='tonexty',
-                showlegend=True
-            ))
+            # Historical data thinned with LTTB for long training windows (residuals below keep every day)
+            keep = lttb_indices(energy_daily.to_numpy())
+
+            # Traces and layout are passed to the Figure in one go, so it is validated once
+            traces = [
+                # Historical data (unscaled for display)
+                go.Scatter(
+                    x=energy_daily.index[keep],
+                    y=energy_daily.to_numpy()[keep],
+                    mode='lines',
+                    name='Historical',
+                    line=dict(color='steelblue', width=2)
+                ),
+                # Forecast
+                go.Scatter(
+                    x=forecast_dates,
+                    y=forecast_mean.values,
+                    mode='lines',
+                    name='Forecast',
+                    line=dict(color='red', width=2, dash='dash')
+                ),
+                # Confidence interval
+                go.Scatter(
+                    x=forecast_dates,
+                    y=forecast_ci.iloc[:, 0].values,
+                    mode='lines',
+                    name=f'{conf_level}% CI Lower',
+                    line=dict(width=0),
+                    showlegend=False,
+                    hoverinfo='skip'
+                ),
+                go.Scatter(
+                    x=forecast_dates,
+                    y=forecast_ci.iloc[:, 1].values,
+                    mode='lines',
+                    name=f'{conf_level}% CI Upper',
+                    line=dict(width=0),
+                    fillcolor='rgba(255, 0, 0, 0.2)',
+                    fill='tonexty',
+                    showlegend=True
+                ),
+            ]
+            layout = go.Layout(
+                title=f"{energy_type} Forecast: {energy_group} in {chosen_area}",
+                xaxis_title="Date",
+                yaxis_title="Energy (kWh/day)",
+                height=600,
+                hovermode='x unified',
+                legend=dict(x=0.01, y=0.99, bgcolor='rgba(255,255,255,0.8)')
+            )
+            fig = go.Figure(data=traces, layout=layout)
             
             # Add vertical line at forecast start
             fig.add_vline(
@@ -334,15 +377,6 @@ if st.button("Run Forecast", type="primary"):
                 annotation_text="Forecast Start"
             )
             
-            fig.update_layout(
-                title=f"{energy_type} Forecast: {energy_group} in {chosen_area}",
-                xaxis_title="Date",
-                yaxis_title="Energy (kWh/day)",
-                height=600,
-                hovermode='x unified',
-                legend=dict(x=0.01, y=0.99, bgcolor='rgba(255,255,255,0.8)')
-            )
-            
             st.plotly_chart(fig, width = 'stretch')
             
             # Forecast statistics
@@ -0,0 +1,72 @@
+import importlib
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+import utils.mongo
+from streamlit.runtime.caching import cache_data_api
+from streamlit.runtime.caching.storage.local_disk_cache_storage import LocalDiskCacheStorageManager
+
+MODULE = "utils.load_energy_data"
+
+
+class FakeCollection:
+    def __init__(self, loads):
+        self.loads = loads
+
+    def find(self, query, projection=None, **kwargs):
+        self.loads.append(query)
+        return iter([{"starttime": datetime(2021, 1, 1), "area": "NO1",
+                      "productiongroup": "hydro", "quantitykwh": 1.0}])
+
+
+class FakeClient:
+    def __init__(self, loads):
+        self.loads = loads
+
+    def __getitem__(self, name):
+        return {"production_collection": FakeCollection(self.loads)}
+
+
+@pytest.fixture
+def loads(monkeypatch, tmp_path):
+    """Disk-backed caches under a temporary home, and a MongoDB client that records every read."""
+    monkeypatch.setattr(Path, "home", lambda: tmp_path)
+    # Outside `streamlit run` caches fall back to memory only - use the runtime's disk storage instead
+    monkeypatch.setattr(cache_data_api.DataCaches, "get_storage_manager",
+                        lambda self: LocalDiskCacheStorageManager())
+    loads = []
+    monkeypatch.setattr(utils.mongo, "get_client", lambda: FakeClient(loads))
+    yield loads
+    sys.modules.pop(MODULE, None)
+
+
+def start_process(monkeypatch):
+    """The module as a newly started app sees it: fresh import, nothing cached in memory."""
+    monkeypatch.setattr(cache_data_api, "_data_caches", cache_data_api.DataCaches())
+    sys.modules.pop(MODULE, None)
+    return importlib.import_module(MODULE)
+
+
+def persisted_entries(tmp_path):
+    return sorted((tmp_path / ".streamlit" / "cache").glob("*.memo"))
+
+
+def test_first_call_after_restart_removes_earlier_days(loads, monkeypatch, tmp_path):
+    # A previous process left an entry for an older day on disk
+    energy = start_process(monkeypatch)
+    energy._load_production(None, None, None, "2000-01-01")
+    stale = persisted_entries(tmp_path)
+    assert len(stale) == 1 and len(loads) == 1
+
+    energy = start_process(monkeypatch)
+    energy.load_energy_data()
+
+    entries = persisted_entries(tmp_path)
+    assert len(entries) == 1 and entries != stale
+    assert len(loads) == 2
+
+    # Later calls the same day are served from the cache
+    energy.load_energy_data()
+    assert len(loads) == 2
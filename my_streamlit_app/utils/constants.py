@@ -10,3 +10,12 @@ data = [
 ]
 
 city_data_df = pd.DataFrame(data, columns=['PriceArea', 'City', 'Longitude', 'Latitude'])
+
+
+# lookups by price area, built once at import
+CITY_BY_AREA = dict(zip(city_data_df['PriceArea'], city_data_df['City']))
+LAT_BY_AREA = dict(zip(city_data_df['PriceArea'], city_data_df['Latitude']))
+LON_BY_AREA = dict(zip(city_data_df['PriceArea'], city_data_df['Longitude']))
+
+# one row (as a dict) per price area, so a page's row is a dict lookup instead of a boolean scan
+AREA_ROWS = city_data_df.set_index('PriceArea', drop=False).to_dict(orient='index')
@@ -0,0 +1,59 @@
+"""
+Downsampling of long time series before plotting.
+Largest-Triangle-Three-Buckets (LTTB) keeps the visual shape (peaks and dips)
+of a line while sending far fewer points to the browser.
+"""
+
+import numpy as np
+
+# Roughly the number of points a full-width line chart can show
+MAX_PLOT_POINTS = 2000
+
+
+def lttb_indices(values, n_out=MAX_PLOT_POINTS):
+    """
+    Positions of the points LTTB keeps from an evenly spaced series.
+
+    Returns all positions when the series is already short enough.
+    The first and last point are always kept.
+    """
+    y = np.asarray(values, dtype=np.float64)
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    # Bucket edges for the n_out - 2 buckets between the first and last point
+    every = (n - 2) / (n_out - 2)
+    edges = (np.arange(n_out - 1) * every).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+
+        # Third triangle corner: mean of the next bucket (or the last point)
+        if i + 2 < len(edges):
+            next_lo, next_hi = edges[i + 1], edges[i + 2]
+            bucket = y[next_lo:next_hi]
+            c_x = (next_lo + next_hi - 1) / 2
+            c_y = np.nanmean(bucket) if not np.isnan(bucket).all() else y[a]
+        else:
+            c_x, c_y = n - 1, y[n - 1]
+
+        b_x = np.arange(lo, hi)
+        area = np.abs((a - c_x) * (y[lo:hi] - y[a]) - (a - b_x) * (c_y - y[a]))
+        a = lo + int(np.nanargmax(area)) if not np.isnan(area).all() else lo
+        keep[i + 1] = a
+    return keep
+
+
+def downsample_frame(df, columns, n_out=MAX_PLOT_POINTS):
+    """
+    Rows of df kept by LTTB for any of the given columns, so all lines share the same x values.
+    """
+    if len(df) <= n_out:
+        return df
+    keep = np.unique(np.concatenate([lttb_indices(df[col].to_numpy(), n_out) for col in columns]))
+    return df.iloc[keep]
@@ -1,19 +1,76 @@
+from datetime import date
+
 import pandas as pd
 import streamlit as st
 from utils.mongo import get_client
+from utils.constants import city_data_df
 
+# Fields used by the pages - everything else (incl. _id) stays in MongoDB
+PRODUCTION_FIELDS = ["starttime", "area", "productiongroup", "quantitykwh"]
+CONSUMPTION_FIELDS = ["starttime", "area", "consumptiongroup", "quantitykwh"]
 
-@st.cache_data
-def load_energy_data(area=None, start_date=None, end_date=None):
+# Low-cardinality string fields - stored as category so filters and groupbys compare codes
+CATEGORY_FIELDS = ["area", "productiongroup", "consumptiongroup"]
+
+MONTH_NAMES = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+]
+
+
+def _read_collection(collection, query, fields):
     """
-    Load production data from MongoDB with optional filtering.
-    Args:
-        area (str): Price area or region to filter.
-        start_date (str or pd.Timestamp): Start date for filtering (inclusive).
-        end_date (str or pd.Timestamp): End date for filtering (inclusive).
-    Returns:
-        pd.DataFrame: Filtered production data.
+    Read only the given fields from a MongoDB collection into a DataFrame.
+    The cursor is consumed directly by pandas, so no intermediate list of documents is built.
+    """
+    projection = {"_id": 0, **{field: 1 for field in fields}}
+    cursor = collection.find(query, projection=projection, batch_size=10_000)
+    df = pd.DataFrame.from_records(cursor, columns=fields)
+
+    # Ensure starttime exists
+    if "starttime" in df.columns:
+        df["starttime"] = pd.to_datetime(df["starttime"])
+    else:
+        raise KeyError(f"Mangler 'starttime'. Kolonner er: {df.columns.tolist()}")
+
+    # Sorted once here, so every filtered subset is already in time order
+    df = df.sort_values("starttime", kind="stable", ignore_index=True)
+
+    df = df.astype({field: "category" for field in fields if field in CATEGORY_FIELDS})
+    # float32 halves the bytes every filter, groupby and plot has to move
+    df["quantitykwh"] = df["quantitykwh"].astype("float32")
+
+    # Ordered categorical keeps month filters cheap and months in calendar order
+    df["month"] = pd.Categorical(df["starttime"].dt.month_name(), categories=MONTH_NAMES, ordered=True)
+    df["year"] = df["starttime"].dt.year
+
+    return df
+
+
+# Page caches built from these frames expire after this long, so they pick up the next day's reload
+ENERGY_VIEW_TTL = 3600
+
+# Day each persisted loader was last cleared in this process (see _for_today)
+_loaded_day = {}
+
+
+def _for_today(loader, *args):
+    """
+    Call a day-keyed loader with today's date, so its data is at most a day old.
+    Persisted caches can't expire by ttl, so the date is part of the cache key instead.
+    The first call of each day in a process - including the first after a restart - removes
+    the loader's entries from disk, so earlier days' frames never pile up.
     """
+    today = date.today().isoformat()
+    if _loaded_day.get(loader) != today:
+        loader.clear()
+        _loaded_day[loader] = today
+    return loader(*args, today)
+
+
+# Loaded frames are kept on disk, keyed on the day. `day` is only part of the cache key
+@st.cache_data(persist="disk", show_spinner="Loading production data...")
+def _load_production(area, start_date, end_date, day):
     client = get_client()
     db = client["energy_database"]
     collection = db["production_collection"]
@@ -29,45 +86,66 @@ def load_energy_data(area=None, start_date=None, end_date=None):
             date_query["$lte"] = pd.to_datetime(end_date)
         query["starttime"] = date_query
 
-    data = list(collection.find(query))
-    df = pd.DataFrame(data)
+    return _read_collection(collection, query, PRODUCTION_FIELDS)
 
-    # Clean
-    if "_id" in df.columns:
-        df.drop(columns=["_id"], inplace=True)
 
-    # Ensure starttime exists
-    if "starttime" in df.columns:
-        df["starttime"] = pd.to_datetime(df["starttime"])
-    else:
-        raise KeyError(f"Mangler 'starttime'. Kolonner er: {df.columns.tolist()}")
+@st.cache_data(persist="disk", show_spinner="Loading consumption data...")
+def _load_consumption(day):
+    client = get_client()
+    db = client["energy_database"]
+    collection = db["consumption_collection"]
 
-    df["month"] = df["starttime"].dt.month_name()
-    df["year"] = df["starttime"].dt.year
+    return _read_collection(collection, {}, CONSUMPTION_FIELDS)
 
-    return df
+
+def load_energy_data(area=None, start_date=None, end_date=None):
+    """
+    Load production data from MongoDB with optional filtering (cached, reloaded once a day).
+    Args:
+        area (str): Price area or region to filter.
+        start_date (str or pd.Timestamp): Start date for filtering (inclusive).
+        end_date (str or pd.Timestamp): End date for filtering (inclusive).
+    Returns:
+        pd.DataFrame: Filtered production data.
+    """
+    return _for_today(_load_production, area, start_date, end_date)
 
 
-@st.cache_data
 def load_consumption_data():
-    """Load consumption data from MongoDB"""
-    client = get_client()
-    db = client["energy_database"]
-    collection = db["consumption_collection"]
-    data = list(collection.find())
-    df = pd.DataFrame(data)
+    """Load consumption data from MongoDB (cached, reloaded once a day)"""
+    return _for_today(_load_consumption)
 
-    # Clean
-    if "_id" in df.columns:
-        df.drop(columns=["_id"], inplace=True)
 
-    # Ensure starttime exists
-    if "starttime" in df.columns:
-        df["starttime"] = pd.to_datetime(df["starttime"])
-    else:
-        raise KeyError(f"Mangler 'starttime'. Kolonner er: {df.columns.tolist()}")
+def _split_by_area(df):
+    """One frame per price area (in starttime order, as loaded). Areas without rows map to an empty frame."""
+    by_area = {
+        area: group.reset_index(drop=True)
+        for area, group in df.groupby("area", observed=True)
+    }
+    # The area categories only come from the loaded rows, so add every known price area explicitly
+    empty = df.iloc[0:0].reset_index(drop=True)
+    for area in city_data_df["PriceArea"]:
+        by_area.setdefault(area, empty)
+    return by_area
 
-    df["month"] = df["starttime"].dt.month_name()
-    df["year"] = df["starttime"].dt.year
 
-    return df
+# Shared across sessions (cache_resource) - callers must copy before modifying a frame.
+# Keyed on the day like the loaders, so a new day's data replaces the old split
+@st.cache_resource(max_entries=1)
+def _production_by_area(day):
+    return _split_by_area(load_energy_data())
+
+
+@st.cache_resource(max_entries=1)
+def _consumption_by_area(day):
+    return _split_by_area(load_consumption_data())
+
+
+def load_energy_by_area():
+    """Production data split by price area once, so pages look up an area instead of masking the full table."""
+    return _production_by_area(date.today().isoformat())
+
+
+def load_consumption_by_area():
+    """Consumption data split by price area once."""
+    return _consumption_by_area(date.today().isoformat())
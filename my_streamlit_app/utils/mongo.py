@@ -1,5 +1,6 @@
 import streamlit as st
 from pymongo.mongo_client import MongoClient
+from pymongo.server_api import ServerApi
 
 # Hent Mongo URI fra st.secrets eller miljøvariabler
 
@@ -13,4 +14,12 @@ def get_mongo_uri():
 @st.cache_resource
 def get_client():
     uri = get_mongo_uri()
-    return MongoClient(uri)
+    # Kept open for the app's lifetime (shared via cache_resource), so no context manager here.
+    # zstd compresses the repeated area/group strings well; zlib is the fallback if zstandard is missing.
+    return MongoClient(
+        uri,
+        server_api=ServerApi("1"),
+        compressors="zstd,zlib",
+        maxPoolSize=4,
+        serverSelectionTimeoutMS=5000,
+    )
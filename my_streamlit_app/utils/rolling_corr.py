@@ -0,0 +1,53 @@
+"""
+Sliding window (Pearson) correlation from running sums.
+Same windows as Series.rolling(window, center=True).corr(other), but every window
+comes from differences of cumulative sums, so the cost doesn't grow with the window size.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _window_sums(values, window):
+    """Sum of each full window of length `window` (len(values) - window + 1 sums)."""
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    return csum[window:] - csum[:-window]
+
+
+def rolling_corr(a, b, window):
+    """
+    Centered sliding window correlation of two series, aligned on the union of their indexes.
+
+    A window is NaN if it has a missing value in either series, or if either series
+    is (numerically) constant in it.
+    """
+    a, b = a.align(b, join="outer")
+    x = a.to_numpy(np.float64)
+    y = b.to_numpy(np.float64)
+    n = len(x)
+    out = np.full(n, np.nan)
+    if window > n:
+        return pd.Series(out, index=a.index)
+
+    # Standardize the valid points first - correlation doesn't change, and the running sums
+    # of squares stay small enough for float64 (raw kWh values would lose precision)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    if valid.any():
+        x = np.where(valid, (x - x[valid].mean()) / (x[valid].std() or 1.0), 0.0)
+        y = np.where(valid, (y - y[valid].mean()) / (y[valid].std() or 1.0), 0.0)
+
+    count = _window_sums(valid.astype(np.float64), window)
+    sx, sy = _window_sums(x, window), _window_sums(y, window)
+    var_x = window * _window_sums(x * x, window) - sx * sx
+    var_y = window * _window_sums(y * y, window) - sy * sy
+    cov = window * _window_sums(x * y, window) - sx * sy
+
+    undefined = (count < window) | (var_x <= 1e-9 * window * window) | (var_y <= 1e-9 * window * window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.sqrt(var_x * var_y)
+    corr[undefined] = np.nan
+
+    # Window k covers positions k..k+window-1 and is labelled like pandas' center=True
+    start = window - 1 - (window - 1) // 2
+    out[start:start + len(corr)] = corr
+    return pd.Series(out, index=a.index)
@@ -15,8 +15,9 @@ def compute_Qupot(hourly_wind_speeds, dt=3600):
     Formula:
        Qupot = sum((u^3.8) * dt) / 233847
     """
-    total = sum((u ** 3.8) * dt for u in hourly_wind_speeds) / 233847
-    return total
+    u = np.asarray(hourly_wind_speeds, dtype=np.float64)
+    total = np.sum(u ** 3.8) * dt / 233847
+    return float(total)
 
 
 def sector_index(direction):
@@ -28,23 +29,32 @@ def sector_index(direction):
     return int(((direction + 11.25) % 360) // 22.5)
 
 
+def _sector_transport_terms(hourly_wind_speeds, hourly_wind_dirs, dt=3600):
+    """
+    Sector index (0-15) and transport contribution (u^3.8 * dt / 233847) [kg/m] of each hour.
+    """
+    u = np.asarray(hourly_wind_speeds, dtype=np.float64)
+    d = np.asarray(hourly_wind_dirs, dtype=np.float64)
+    # Same binning as sector_index(), for all hours at once
+    idx = (((d + 11.25) % 360) // 22.5).astype(np.int64)
+    w = (u ** 3.8) * (dt / 233847)
+    return idx, w
+
+
 def compute_sector_transport(hourly_wind_speeds, hourly_wind_dirs, dt=3600):
     """
     Compute the cumulative transport for each of 16 wind sectors.
     
     Parameters:
-      hourly_wind_speeds: list of wind speeds [m/s]
-      hourly_wind_dirs: list of wind directions [degrees]
+      hourly_wind_speeds: list or array of wind speeds [m/s]
+      hourly_wind_dirs: list or array of wind directions [degrees]
       dt: time step in seconds
       
     Returns:
-      A list of 16 transport values (kg/m) corresponding to the sectors.
+      An array of 16 transport values (kg/m) corresponding to the sectors.
     """
-    sectors = [0.0] * 16
-    for u, d in zip(hourly_wind_speeds, hourly_wind_dirs):
-        idx = sector_index(d)
-        sectors[idx] += ((u ** 3.8) * dt) / 233847
-    return sectors
+    idx, w = _sector_transport_terms(hourly_wind_speeds, hourly_wind_dirs, dt)
+    return np.bincount(idx, weights=w, minlength=16)
 
 
 def compute_snow_transport(T, F, theta, Swe, hourly_wind_speeds, dt=3600):
@@ -56,7 +66,7 @@ def compute_snow_transport(T, F, theta, Swe, hourly_wind_speeds, dt=3600):
       F: Fetch distance (m)
       theta: Relocation coefficient
       Swe: Total snowfall water equivalent (mm)
-      hourly_wind_speeds: list of wind speeds [m/s]
+      hourly_wind_speeds: list or array of wind speeds [m/s]
       dt: time step in seconds
       
     Returns:
@@ -107,11 +117,12 @@ def compute_yearly_results(df, T, F, theta):
         if df_season.empty:
             continue
         # Calculate hourly Swe: precipitation counts when temperature < +1°C.
-        df_season = df_season.copy()  # avoid SettingWithCopyWarning
-        df_season['Swe_hourly'] = df_season.apply(
-            lambda row: row['precipitation'] if row['temperature_2m'] < 1 else 0, axis=1)
-        total_Swe = df_season['Swe_hourly'].sum()
-        wind_speeds = df_season["wind_speed_10m"].tolist()
+        swe_hourly = np.where(
+            df_season['temperature_2m'].to_numpy() < 1,
+            df_season['precipitation'].to_numpy(np.float64),
+            0.0)
+        total_Swe = swe_hourly.sum()
+        wind_speeds = df_season["wind_speed_10m"].to_numpy()
         result = compute_snow_transport(T, F, theta, total_Swe, wind_speeds)
         result["season"] = f"{s}-{s+1}"
         result["start_year"] = s
@@ -119,22 +130,18 @@ def compute_yearly_results(df, T, F, theta):
     return pd.DataFrame(results_list)
 
 
-def compute_average_sector(df):
+def compute_average_sector(df, dt=3600):
     """
     Compute the average directional breakdown (sectors) over all seasons.
     The function groups the data by season and computes the sector contributions
     for each season, then returns the mean across seasons.
     """
-    sectors_list = []
-    for s, group in df.groupby('season'):
-        group = group.copy()
-        group['Swe_hourly'] = group.apply(
-            lambda row: row['precipitation'] if row['temperature_2m'] < 1 else 0, axis=1)
-        ws = group["wind_speed_10m"].tolist()
-        wdir = group["wind_direction_10m"].tolist()
-        sectors = compute_sector_transport(ws, wdir)
-        sectors_list.append(sectors)
-    avg_sectors = np.mean(sectors_list, axis=0)
+    season_idx = df.groupby('season').ngroup().to_numpy()
+    n_seasons = season_idx.max() + 1
+    sector_idx, w = _sector_transport_terms(df["wind_speed_10m"], df["wind_direction_10m"], dt)
+    # One (season, sector) bin per cell of a n_seasons x 16 matrix, filled in a single pass over all hours
+    sectors = np.bincount(season_idx * 16 + sector_idx, weights=w, minlength=n_seasons * 16)
+    avg_sectors = sectors.reshape(n_seasons, 16).mean(axis=0)
     return avg_sectors
 
 
@@ -1,11 +1,105 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+
+import numpy as np
 import openmeteo_requests
 import requests_cache
 from retry_requests import retry
 import pandas as pd
+import streamlit as st
+
+# HTTP cache lives next to the app, not in whatever directory streamlit was started from
+CACHE_PATH = Path(__file__).resolve().parent.parent / ".cache"
+
+# Hourly variables fetched by default (all the pages use)
+WEATHER_VARIABLES = ("temperature_2m", "precipitation", "wind_speed_10m", "wind_gusts_10m", "wind_direction_10m")
+
+
+def _make_client(expire_after):
+    """Open-Meteo client on a retrying, cached HTTP session (a stale copy is used if the API fails)."""
+    cache_session = requests_cache.CachedSession(str(CACHE_PATH), expire_after=expire_after, stale_if_error=True)
+    retry_session = retry(cache_session, retries=3, backoff_factor=0.3)
+    return openmeteo_requests.Client(session=retry_session)
+
+
+# Built once and shared by every call, so each fetch reuses the connection pool and the open cache file.
+# The HTTP cache keeps one response per location and year on disk. A finished year never changes
+# in the archive, so only responses for the current year expire
+_ARCHIVE_CLIENT = _make_client(requests_cache.NEVER_EXPIRE)
+_CURRENT_YEAR_CLIENT = _make_client(3600)
+
+
+def _fetch_year(latitude, longitude, year, variables=WEATHER_VARIABLES):
+    """One year of the given hourly weather variables from the archive API, indexed by time."""
+    openmeteo = _CURRENT_YEAR_CLIENT if year >= date.today().year else _ARCHIVE_CLIENT
+
+    url = "https://archive-api.open-meteo.com/v1/archive"
+    params = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "start_date": f"{year}-01-01",
+        "end_date": f"{year}-12-31",
+        "hourly": list(variables),
+        "timezone": "Europe/Oslo"
+    }
+
+    responses = openmeteo.weather_api(url, params=params)
+    response = responses[0]
+    hourly = response.Hourly()
+
+    # Variables come back in the order they were requested.
+    # float32 is plenty for weather data and halves the memory of every later step
+    # (copy=False: the API's arrays are usually float32 already, so nothing is copied)
+    columns = {
+        name: hourly.Variables(i).ValuesAsNumpy().astype(np.float32, copy=False)
+        for i, name in enumerate(params["hourly"])
+    }
+
+    # One timestamp per value, from the start time and the step
+    times = pd.date_range(
+        start=pd.Timestamp(hourly.Time(), unit="s"),
+        periods=len(next(iter(columns.values()))),
+        freq=pd.Timedelta(seconds=hourly.Interval()),
+        name="time"
+    )
+
+    df = pd.DataFrame(columns, index=times)
+    return df
+
+
+def _fetch_years(latitude, longitude, year, variables):
+    """Fetch one year, or a list of years combined into one frame."""
+    # Handle single year or list of years
+    if isinstance(year, (list, tuple)):
+        # Multiple years - one request per year, sent concurrently (waiting on the network, so threads are enough)
+        with ThreadPoolExecutor(max_workers=min(8, len(year))) as pool:
+            df_list = list(pool.map(lambda y: _fetch_year(latitude, longitude, y, variables), year))
+
+        # Combine all years
+        df = pd.concat(df_list)
+    else:
+        df = _fetch_year(latitude, longitude, year, variables)
+    
+    return df
+
+
+# archive data for completed years doesn't change, so those results are also kept on disk across restarts
+@st.cache_data(persist="disk", show_spinner="Fetching weather data...")
+def _archived_weather(latitude, longitude, year, variables):
+    return _fetch_years(latitude, longitude, year, variables)
+
+
+# anything including the current year is still growing - kept in memory for an hour only,
+# like its HTTP responses (persisted caches can't expire)
+@st.cache_data(ttl=3600, show_spinner="Fetching weather data...")
+def _recent_weather(latitude, longitude, year, variables):
+    return _fetch_years(latitude, longitude, year, variables)
+
 
 # function for retrieving data from open meteo API 
 # based on open meteo API python code
-def get_weather_data(latitude, longitude, year=2021):
+def get_weather_data(latitude, longitude, year=2021, variables=WEATHER_VARIABLES):
     """
     Fetch weather data from Open-Meteo API for specified location and year(s).
     
@@ -13,84 +107,14 @@ def get_weather_data(latitude, longitude, year=2021):
     - latitude: float
     - longitude: float  
     - year: int or list of ints (e.g., 2021 or [2021, 2022, 2023, 2024])
+    - variables: tuple of hourly variable names (default: WEATHER_VARIABLES)
     
     Returns:
     - DataFrame with datetime index and weather columns
-    """
-    cache_session = requests_cache.CachedSession('.cache', expire_after=3600)
-    retry_session = retry(cache_session, retries=3, backoff_factor=0.3)
-    openmeteo = openmeteo_requests.Client(session=retry_session)
 
-    url = "https://archive-api.open-meteo.com/v1/archive"
-    
-    # Handle single year or list of years
-    if isinstance(year, (list, tuple)):
-        # Multiple years - load and combine
-        df_list = []
-        for y in year:
-            params = {
-                "latitude": latitude,
-                "longitude": longitude,
-                "start_date": f"{y}-01-01",
-                "end_date": f"{y}-12-31",
-                "hourly": ["temperature_2m", "precipitation", "wind_speed_10m", "wind_gusts_10m", "wind_direction_10m"],
-                "timezone": "Europe/Oslo"
-            }
-            
-            responses = openmeteo.weather_api(url, params=params)
-            response = responses[0]
-            hourly = response.Hourly()
-
-            times = pd.date_range(
-                start=pd.to_datetime(hourly.Time(), unit="s"),
-                end=pd.to_datetime(hourly.TimeEnd(), unit="s"),
-                freq=pd.Timedelta(seconds=hourly.Interval()),
-                inclusive="left"
-            )
-
-            df_year = pd.DataFrame({
-                "time": times,
-                "temperature_2m": hourly.Variables(0).ValuesAsNumpy(),
-                "precipitation": hourly.Variables(1).ValuesAsNumpy(),
-                "wind_speed_10m": hourly.Variables(2).ValuesAsNumpy(),
-                "wind_gusts_10m": hourly.Variables(3).ValuesAsNumpy(),
-                "wind_direction_10m": hourly.Variables(4).ValuesAsNumpy(),
-            })
-            df_list.append(df_year)
-        
-        # Combine all years
-        df = pd.concat(df_list, ignore_index=True)
-        df.set_index("time", inplace=True)
-    else:
-        # Single year - original code
-        params = {
-            "latitude": latitude,
-            "longitude": longitude,
-            "start_date": f"{year}-01-01",
-            "end_date": f"{year}-12-31",
-            "hourly": ["temperature_2m", "precipitation", "wind_speed_10m", "wind_gusts_10m", "wind_direction_10m"],
-            "timezone": "Europe/Oslo"
-        }
-
-        responses = openmeteo.weather_api(url, params=params)
-        response = responses[0]
-        hourly = response.Hourly()
-
-        times = pd.date_range(
-            start=pd.to_datetime(hourly.Time(), unit="s"),
-            end=pd.to_datetime(hourly.TimeEnd(), unit="s"),
-            freq=pd.Timedelta(seconds=hourly.Interval()),
-            inclusive="left"
-        )
-
-        df = pd.DataFrame({
-            "time": times,
-            "temperature_2m": hourly.Variables(0).ValuesAsNumpy(),
-            "precipitation": hourly.Variables(1).ValuesAsNumpy(),
-            "wind_speed_10m": hourly.Variables(2).ValuesAsNumpy(),
-            "wind_gusts_10m": hourly.Variables(3).ValuesAsNumpy(),
-            "wind_direction_10m": hourly.Variables(4).ValuesAsNumpy(),
-        })
-        df.set_index("time", inplace=True)
-    
-    return df
+    Results for completed years are cached on disk. Anything including the current
+    year is cached in memory for an hour, so it picks up new archive data.
+    """
+    years = year if isinstance(year, (list, tuple)) else [year]
+    cached = _recent_weather if max(years) >= date.today().year else _archived_weather
+    return cached(latitude, longitude, year, variables)